@@ -2,6 +2,8 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from qlearning import q_learning_fit, best_parameters
+
 # ======================
 # 1. Load Your CSV Data
 # ======================
@@ -17,89 +19,29 @@ y_true = df["Dwell_Time"].values
 # ======================
 # 2. Define RL Parameters
 # ======================
-# Discretize m and c (for simplicity)
-m_range = np.linspace(0.0, 2.0, 20)  # Possible m values
-c_range = np.linspace(0.0, 30.0, 20)  # Possible c values
-
-# Q-Table: Key = (m_idx, c_idx), Value = Q-values for actions
-Q = {}
-for m_idx in range(len(m_range)):
-    for c_idx in range(len(c_range)):
-        Q[(m_idx, c_idx)] = np.zeros(4)  # 4 actions: [↑m, ↓m, ↑c, ↓c]
+# Discretize m and c
+m_range = np.linspace(0.0, 2.0, 200)  # Possible m values
+c_range = np.linspace(0.0, 30.0, 200)  # Possible c values
 
 # Hyperparameters
 alpha = 0.1  # Learning rate
 gamma = 0.9  # Discount factor
 epsilon = 0.3  # Exploration rate
-episodes = 10  # Training iterations
+episodes = 50_000  # Training episodes
+n_envs = 2048  # Episodes stepped together
 
 # ======================
 # 3. Q-Learning Algorithm
 # ======================
-def get_reward(m, c):
-    y_pred = m * X + c
-    mse = np.mean((y_true - y_pred) ** 2)
-    return -mse  # Higher reward = lower error
-
-for episode in range(episodes):
-    # Random initial m and c
-    m_idx = np.random.randint(0, len(m_range))
-    c_idx = np.random.randint(0, len(c_range))
-    m = m_range[m_idx]
-    c = c_range[c_idx]
-    
-    while True:
-        # Choose action (ε-greedy)
-        if np.random.random() < epsilon:
-            action = np.random.randint(0, 4)  # Explore
-        else:
-            action = np.argmax(Q[(m_idx, c_idx)])  # Exploit
-        
-        # Apply action
-        if action == 0 and m_idx < len(m_range) - 1:  # ↑m
-            new_m_idx = m_idx + 1
-            new_c_idx = c_idx
-        elif action == 1 and m_idx > 0:  # ↓m
-            new_m_idx = m_idx - 1
-            new_c_idx = c_idx
-        elif action == 2 and c_idx < len(c_range) - 1:  # ↑c
-            new_m_idx = m_idx
-            new_c_idx = c_idx + 1
-        elif action == 3 and c_idx > 0:  # ↓c
-            new_m_idx = m_idx
-            new_c_idx = c_idx - 1
-        else:
-            new_m_idx, new_c_idx = m_idx, c_idx  # No change if at boundary
-        
-        new_m = m_range[new_m_idx]
-        new_c = c_range[new_c_idx]
-        
-        # Calculate reward
-        reward = get_reward(new_m, new_c)
-        
-        # Update Q-Table
-        Q[(m_idx, c_idx)][action] += alpha * (
-            reward + gamma * np.max(Q[(new_m_idx, new_c_idx)]) - Q[(m_idx, c_idx)][action]
-        )
-        
-        # Update state
-        m_idx, c_idx = new_m_idx, new_c_idx
-        m, c = new_m, new_c
-        
-        # Terminate if no improvement
-        if reward >= -5.0:  # Stop if MSE < 5
-            break
+# Dense Q array (m_idx, c_idx, action) and the -MSE reward surface are built once;
+# all environments step together as array operations (see qlearning.py)
+Q, R = q_learning_fit(X, y_true, m_range, c_range, episodes=episodes, n_envs=n_envs,
+                      alpha=alpha, gamma=gamma, epsilon=epsilon, stop_reward=-5.0)
 
 # ======================
 # 4. Extract Best m and c
 # ======================
-best_q = -np.inf
-best_m, best_c = 0.0, 0.0
-for (m_idx, c_idx), q_values in Q.items():
-    if np.max(q_values) > best_q:
-        best_q = np.max(q_values)
-        best_m = m_range[m_idx]
-        best_c = c_range[c_idx]
+best_m, best_c = best_parameters(Q, m_range, c_range)
 
 print(f"Optimal parameters (RL): m = {best_m:.2f}, c = {best_c:.2f}")
 
@@ -51,17 +51,7 @@ plt.grid(True)
 plt.tight_layout()  
 plt.show()  
 
-# --- Interactive Prediction ---
-while True:  
-    user_input = input("Enter time (HH:MM) or 'exit': ").strip()  
-    if user_input.lower() == 'exit':  
-        break  
-    try:  
-        hour, minute = map(int, user_input.split(":"))  
-        minutes_input = hour * 60 + minute  
-        predicted_dwell = model.predict([[minutes_input]])[0]  
-        print(f"Predicted dwell time at {user_input}: {predicted_dwell:.2f} seconds")  
-    except:  
-        print("Invalid format. Use HH:MM (e.g., 15:30).")
-        
-        
\ No newline at end of file
+# --- Batch Prediction ---
+# Predictions for whole days of stops come from predict_dwell.py, which loads the
+# persisted model of this script's process (dwell_registry.STUDIES) instead of retraining, e.g.
+#   python predict_dwell.py times.txt --study csvshreyascinema --output dwell.csv
@@ -1,11 +1,15 @@
 import pandas as pd
-from datetime import datetime, timedelta
 import numpy as np
 #import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import matplotlib.ticker as ticker
 
+from sim_time import to_seconds, format_times
+from timetable_builder import chain_legs, cumulative_offsets, expand_trips
+from timetable_store import load_timetable
+from timetable_stream import CsvSink, ColumnarSink, write_stream
+
 # Column headers
 columns = [
     'train_id', 'arrival_train_time', 'departuretime', 'train_station', 'train_line',
@@ -58,40 +62,85 @@ headway = 10 * 60  # 0 minutes headway
 num_train=17820/(headway+dwell_time) # 17820 is the total time in seconds for 24 hours
 num_trains = int(num_train)  # Number of trains in 24 hours
 
-all_data = []
-
-for t in range(num_trains):
-    train_id = f"t{t+1:03d}"
-    start_time = datetime.strptime('04:57', '%H:%M') + timedelta(seconds=t * headway)
-    for idx, s in enumerate(stations):
-        if idx == 0:
-            arrival = start_time
-        else:
-            arrival = departure
-        departure = arrival + timedelta(seconds=s[4] + s[5])
-        if s[3] is not None:
-            topspeed = (float(s[3]) / float(s[4])) * 3.6
-        else:
-            topspeed = None
-        all_data.append([
-            train_id,
-            arrival.strftime('%H:%M'),
-            (arrival + timedelta(seconds=s[4])).strftime('%H:%M:%S'),
-            s[0], s[1], s[2],
-            s[3], s[4], s[5], s[6],
-            round(topspeed, 2) if topspeed is not None else ''
-        ])
-
-# Create DataFrame ONCE, after all data is collected
-df = pd.DataFrame(all_data, columns=columns)
-df.to_csv('train_schedule_326.csv', index=False)
-
-# After your DataFrame is created
-train_id = df['train_id'].unique()[0]
-train_df = df[df['train_id'] == train_id]
+# Every trip is the same template shifted by t * headway: build it once and broadcast
+def arrival_offsets(route):
+    """Arrival of every stop of a trip over `route`, in seconds after the trip start"""
+    return cumulative_offsets(np.array([s[4] for s in route]) + np.array([s[5] for s in route]))
+
+def schedule_frame(starts, route, suffix='', first_train=0):
+    """Schedule rows for trips leaving at `starts` (s) over the stations in `route`"""
+    run_time = np.array([s[4] for s in route])
+    dwell = np.array([s[5] for s in route])
+    topspeeds = np.array([round(float(s[3]) / float(s[4]) * 3.6, 2) if s[3] is not None else '' for s in route], dtype=object)
+    offsets = arrival_offsets(route)
+    trips = expand_trips(
+        starts,
+        {"arrival": offsets, "run_end": offsets + run_time, "station": np.arange(len(route))},
+    )
+    station_idx = trips["station"]
+    frame = pd.DataFrame({
+        'train_id': pd.Series(trips["trip"] + first_train + 1).astype(str).str.zfill(3).radd('t').to_numpy() + suffix,
+        'arrival_train_time': format_times(trips["arrival"]),
+        'departuretime': format_times(trips["run_end"]),
+        'train_station': np.array([s[0] for s in route])[station_idx],
+        'train_line': np.array([s[1] for s in route])[station_idx],
+        'train_type': np.array([s[2] for s in route])[station_idx],
+        'distancetonext': np.array([np.nan if s[3] is None else s[3] for s in route], dtype=float)[station_idx],
+        'durationofmovementinsec': run_time[station_idx],
+        'dwell_timein_sec': dwell[station_idx],
+        'civil speed limit': np.array([s[6] for s in route])[station_idx],
+        'topspeedlimit': topspeeds[station_idx],
+    }, columns=columns)
+    return frame
+
+def hourly_chunks(starts, route, suffix=''):
+    """Yield the schedule one hour of trip starts at a time, so memory stays at one chunk"""
+    hours = starts // 3600
+    for hour in np.unique(hours):
+        trips = np.flatnonzero(hours == hour)
+        yield schedule_frame(starts[trips], route, suffix, first_train=trips[0])
+
+forward_starts = to_seconds('04:57') + np.arange(num_trains) * headway
+
+turnaround_time = 15*60 # seconds at GAIMUKH before return (adjust as needed)
+cycles = 1  # forward -> turnaround -> return round trips run by each rake
+
+# Each leg ends at its terminal arrival, taken straight from the trip template, so the
+# next leg needs no scan of the schedule: chain_legs gives the start of every leg of
+# every rake in one cumsum.
+gaimukh_idx = [s[0] for s in stations].index('GAIMUKH')
+return_route = stations[gaimukh_idx::-1]
+forward_leg = arrival_offsets(stations)[gaimukh_idx]
+return_leg = arrival_offsets(return_route)[-1]
+leg_starts = chain_legs(forward_starts, [forward_leg, return_leg] * cycles, turnaround_time)
+
+def leg_suffix(cycle, direction=''):
+    """Train-id suffix of one leg: the first cycle keeps the plain t001 / t001_R ids"""
+    return (f'_{cycle + 1}' if cycle else '') + direction
+
+# Stream every hour of trips straight to the CSVs and to the typed columnar copy
+# (categorical names, int32 seconds, float32 numbers) used by the simulators
+with CsvSink('train_schedule_326.csv') as forward_csv, \
+        CsvSink('train_schedule_326_with_return.csv') as full_csv, \
+        ColumnarSink('train_schedule_326_with_return_columns',
+                     time_columns=['arrival_train_time', 'departuretime'],
+                     category_columns=['train_id', 'train_station', 'train_line', 'train_type'],
+                     float_columns=['distancetonext', 'civil speed limit', 'topspeedlimit']) as store:
+    for cycle in range(cycles):
+        write_stream(hourly_chunks(leg_starts[2 * cycle], stations, leg_suffix(cycle)),
+                     forward_csv, full_csv, store)
+        write_stream(hourly_chunks(leg_starts[2 * cycle + 1], return_route, leg_suffix(cycle, '_R')),
+                     full_csv, store)
+
+# Read the first train back from the columnar copy: only the columns used are mapped
+# from disk and the train filter compares integer codes, with no CSV parsing
+schedule = load_timetable('train_schedule_326_with_return_columns',
+                          columns=['train_id', 'train_station', 'topspeedlimit'])
+train_id = schedule.categories['train_id'][0]
+train_df = schedule.select(schedule['train_id'] == schedule.code('train_id', train_id)).to_frame()
 
 # Filter out rows where topspeedlimit is empty
-plot_df = train_df[train_df['topspeedlimit'] != '']
+plot_df = train_df[train_df['topspeedlimit'].notna()]
 
 
 # Plot speed between stations (segment-wise)
@@ -118,39 +167,4 @@ plt.title('Speed Profile Between Stations')
 plt.tight_layout()
 plt.show()
 
-turnaround_time = 15*60 # seconds at GAIMUKH before return (adjust as needed)
-
-for t in range(num_trains):
-    train_id = f"t{t+1:03d}_R"  # _R for return
-    # Find the arrival time at GAIMUKH for this train
-    forward_rows = [row for row in all_data if row[0] == f"t{t+1:03d}" and row[3] == 'GAIMUKH']
-    if not forward_rows:
-        continue  # skip if no forward trip to GAIMUKH
-    last_arrival_str = forward_rows[0][1]
-    last_arrival = datetime.strptime(last_arrival_str, '%H:%M')
-    # Start return after turnaround
-    start_time = last_arrival + timedelta(seconds=turnaround_time)
-    for idx, s in enumerate(reversed(stations)):
-        if idx == 0:
-            arrival = start_time
-        else:
-            arrival = departure
-        departure = arrival + timedelta(seconds=s[4] + s[5])
-        if s[3] is not None:
-            topspeed = (float(s[3]) / float(s[4])) * 3.6
-        else:
-            topspeed = None
-        all_data.append([
-            train_id,
-            arrival.strftime('%H:%M'),
-            (arrival + timedelta(seconds=s[4])).strftime('%H:%M:%S'),
-            s[0], s[1], s[2],
-            s[3], s[4], s[5], s[6],
-            round(topspeed, 2) if topspeed is not None else ''
-        ])
-
-# Create DataFrame ONCE, after all data is collected (forward + return)
-df = pd.DataFrame(all_data, columns=columns)
-df.to_csv('train_schedule_326_with_return.csv', index=False)
-
 
@@ -1,32 +1,19 @@
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime
 
-# Read the timetable
-df = pd.read_csv("timetable_5to6.csv")
+from schedule_reader import read_schedule
+from sim_time import MISSING
 
-# Convert time strings to seconds since 5:00:00
-def time_to_seconds(t):
-    if t == "--":
-        return None
-    h, m, s = map(int, t.split(":"))
-    return h*3600 + m*60 + s
+# Read the timetable: Arrival/Departure come back as int32 seconds ("--" -> MISSING)
+df = read_schedule("timetable_5to6.csv")
 
-df['Arrival_sec'] = df['Arrival'].apply(time_to_seconds)
-df['Departure_sec'] = df['Departure'].apply(time_to_seconds)
-
-# Build the plot data
-y = []
-x = []
+# Build the plot data: arrival then departure of every station, skipping missing times
+times = df[['Arrival', 'Departure']].to_numpy()
+rows = np.repeat(np.arange(len(df)), 2)
+keep = times.ravel() != MISSING
+x = times.ravel()[keep].tolist()
+y = rows[keep].tolist()
 station_labels = df['Station'].tolist()
-for i, row in df.iterrows():
-    # For the first station, only departure
-    if row['Arrival'] != "--":
-        x.append(row['Arrival_sec'])
-        y.append(i)
-    if row['Departure'] != "--":
-        x.append(row['Departure_sec'])
-        y.append(i)
 
 # Convert seconds to HH:MM for x-ticks
 def sec_to_hhmm(sec):
@@ -34,7 +21,7 @@ def sec_to_hhmm(sec):
     m = (sec % 3600) // 60
     return f"{int(h):02d}:{int(m):02d}"
 
-xticks = sorted(set([v for v in x if v is not None]))
+xticks = sorted(set(x))
 xticklabels = [sec_to_hhmm(v) for v in xticks]
 
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,93 @@
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import PolynomialFeatures, SplineTransformer
+from sklearn.svm import SVR
+
+from dwell_registry import DEFAULT_SEED, STUDIES, synthetic_dwell_data
+
+# ----------- Synthetic Station Data -----------
+# The dwell processes of generator.py, shreyascinema.py and csvshreyascinema.py, as
+# registered in dwell_registry.STUDIES (study name -> station, process)
+def study_frame(study, seed=DEFAULT_SEED):
+    station, process = STUDIES[study]
+    return synthetic_dwell_data(station, seed=seed, process=process)
+
+
+# ----------- Candidate Models -----------
+def candidate_models():
+    return {
+        "Linear": lambda: LinearRegression(),
+        "Polynomial (deg=5)": lambda: make_pipeline(PolynomialFeatures(degree=5), LinearRegression()),
+        "Random Forest": lambda: RandomForestRegressor(n_estimators=100, random_state=42),
+        "SVR (RBF kernel)": lambda: SVR(kernel="rbf"),
+        "Hist GBDT": lambda: HistGradientBoostingRegressor(random_state=42),
+        "Spline + Ridge": lambda: make_pipeline(SplineTransformer(n_knots=24, degree=3), Ridge(alpha=1.0)),
+    }
+
+
+def _latency(model, X, repeats=200):
+    row = X[:1]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(row)
+    return (time.perf_counter() - start) / repeats
+
+
+def _throughput(model, X, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(X)
+    return len(X) * repeats / (time.perf_counter() - start)
+
+
+# ----------- Benchmark -----------
+def benchmark(studies=None, models=None, n_splits=5, seed=DEFAULT_SEED):
+    """Time-ordered cross-validation of every model on every study's station.
+
+    Returns one row per (station, model) with mean fit time, single-row latency,
+    batch throughput, pickled model size and held-out MAE across the folds.
+    """
+    studies = list(STUDIES) if studies is None else studies
+    models = candidate_models() if models is None else models
+    day = np.arange(1440).reshape(-1, 1)
+    rows = []
+    for study in studies:
+        df = study_frame(study, seed)
+        station = df["Station"].iloc[0]
+        X = df[["Minutes"]].to_numpy()
+        y = df["Dwell_Time"].to_numpy()
+        for name, make_model in models.items():
+            fit_times, maes = [], []
+            for train_idx, test_idx in TimeSeriesSplit(n_splits=n_splits).split(X):
+                model = make_model()
+                start = time.perf_counter()
+                model.fit(X[train_idx], y[train_idx])
+                fit_times.append(time.perf_counter() - start)
+                maes.append(np.mean(np.abs(model.predict(X[test_idx]) - y[test_idx])))
+            model = make_model().fit(X, y)
+            rows.append({
+                "Station": station,
+                "Model": name,
+                "Fit_Seconds": np.mean(fit_times),
+                "Latency_us": _latency(model, X) * 1e6,
+                "Throughput_per_s": _throughput(model, day),
+                "Size_KB": len(pickle.dumps(model)) / 1024,
+                "MAE": np.mean(maes),
+            })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    if len(sys.argv) > 1:
+        results.to_csv(sys.argv[1], index=False)
+        print(f"Results saved to '{sys.argv[1]}'")
@@ -0,0 +1,90 @@
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+
+# ----------- Minute-of-Day Dwell Table -----------
+class DwellTable:
+    """Dense (station x minute-of-day) dwell predictions"""
+
+    def __init__(self, stations, table):
+        self.stations = list(stations)
+        self.index = {name: i for i, name in enumerate(self.stations)}
+        self.table = table
+
+    def at(self, station, minute):
+        """Dwell for one station name at one minute since midnight"""
+        return self.table[self.index[station], minute % MINUTES_PER_DAY]
+
+    def lookup(self, station_idx, minutes):
+        """Vectorized dwell for arrays of station indices and minutes since midnight"""
+        return self.table[station_idx, np.asarray(minutes) % MINUTES_PER_DAY]
+
+    def interpolate(self, station_idx, seconds):
+        """Dwell linearly interpolated to the second, seconds counted from midnight"""
+        minutes = np.asarray(seconds, dtype=float) / 60.0
+        lower = np.floor(minutes).astype(np.int64)
+        frac = minutes - lower
+        lo = self.table[station_idx, lower % MINUTES_PER_DAY]
+        hi = self.table[station_idx, (lower + 1) % MINUTES_PER_DAY]
+        return lo + (hi - lo) * frac
+
+
+def compile_dwell_table(models):
+    """Evaluate each station's model over all 1440 minutes in one batched predict per station"""
+    minutes = np.arange(MINUTES_PER_DAY).reshape(-1, 1)
+    stations = list(models)
+    table = np.empty((len(stations), MINUTES_PER_DAY))
+    for i, station in enumerate(stations):
+        table[i] = models[station].predict(minutes)
+    return DwellTable(stations, table)
+
+
+# ----------- Quantile Dwell Tables -----------
+class DwellQuantileTable:
+    """(station x quantile level x minute) dwell quantiles from the spread of a forest's trees"""
+
+    def __init__(self, stations, levels, table):
+        self.stations = list(stations)
+        self.index = {name: i for i, name in enumerate(self.stations)}
+        self.levels = levels
+        self.table = table
+
+    def _interp(self, station_idx, minutes, u):
+        pos = np.asarray(u) * (len(self.levels) - 1)
+        lower = np.minimum(np.floor(pos).astype(np.int64), len(self.levels) - 2)
+        frac = pos - lower
+        minutes = np.asarray(minutes) % MINUTES_PER_DAY
+        lo = self.table[station_idx, lower, minutes]
+        hi = self.table[station_idx, lower + 1, minutes]
+        return lo + (hi - lo) * frac
+
+    def quantile(self, station_idx, minutes, q):
+        """Dwell quantile q (e.g. 0.5, 0.8, 0.95) for arrays of stations and minutes"""
+        return self._interp(station_idx, minutes, q)
+
+    def sample(self, station_idx, minutes, rng=None, size=None):
+        """Draw dwells by inverse-CDF sampling of the quantile grid.
+
+        With size=None one draw is made per (station, minute) pair; otherwise
+        `size` must broadcast against them, e.g. (1000, n_stops).
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        shape = np.broadcast(station_idx, minutes).shape if size is None else size
+        return self._interp(station_idx, minutes, rng.random(shape))
+
+
+def tree_predictions(model, X):
+    """Per-tree predictions of a RandomForest, shape (n_trees, len(X))"""
+    return np.stack([tree.predict(X) for tree in model.estimators_])
+
+
+def compile_quantile_tables(models, n_levels=21):
+    """Quantile grid (evenly spaced from 0 to 1; P50/P80/P95 fall on it) of every station over the whole day"""
+    minutes = np.arange(MINUTES_PER_DAY).reshape(-1, 1).astype(float)
+    levels = np.linspace(0.0, 1.0, n_levels)
+    stations = list(models)
+    table = np.empty((len(stations), n_levels, MINUTES_PER_DAY))
+    for i, station in enumerate(stations):
+        table[i] = np.quantile(tree_predictions(models[station], minutes), levels, axis=0)
+    return DwellQuantileTable(stations, levels, table)
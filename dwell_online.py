@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from dwell_lookup import MINUTES_PER_DAY, DwellTable
+
+
+# ----------- Online Dwell Corrections -----------
+class OnlineDwellTable(DwellTable):
+    """DwellTable that tracks live observations without retraining the forests.
+
+    Observed dwells are kept in a fixed-size ring buffer. Their residuals against the
+    compiled model table are summed per (station, time bucket) over a rolling window,
+    and lookups return the model dwell plus the shrunk mean residual of the bucket.
+    The passenger count of each record conditions the residuals: a per-station slope of
+    residual against load is fitted over the same window, and lookup_load() moves the
+    bucket's dwell by that slope times the gap between a live count and the bucket's
+    mean load.
+    """
+
+    def __init__(self, base, window_seconds=2 * 3600, bucket_minutes=15, capacity=50_000, prior_weight=5.0):
+        super().__init__(base.stations, base.table.copy())
+        self.base = base
+        self.window_seconds = window_seconds
+        self.bucket_minutes = bucket_minutes
+        self.prior_weight = prior_weight
+        n_buckets = -(-MINUTES_PER_DAY // bucket_minutes)
+        self.residual_sum = np.zeros((len(self.stations), n_buckets))
+        self.count = np.zeros((len(self.stations), n_buckets))
+        self.passenger_sum = np.zeros((len(self.stations), n_buckets))
+        # Per-station sums of n, p, r, p*p and p*r for the residual-on-load regression
+        self.load_moments = np.zeros((len(self.stations), 5))
+        self.slope = np.zeros(len(self.stations))
+        self.load_mean = np.zeros((len(self.stations), n_buckets))
+
+        self.capacity = capacity
+        self._time = np.zeros(capacity, dtype=np.int64)
+        self._station = np.zeros(capacity, dtype=np.int64)
+        self._bucket = np.zeros(capacity, dtype=np.int64)
+        self._residual = np.zeros(capacity)
+        self._passengers = np.zeros(capacity)
+        self._head = 0   # oldest live record
+        self._size = 0
+
+    @staticmethod
+    def _moments(passengers, residual):
+        return np.column_stack([np.ones_like(residual), passengers, residual,
+                                passengers * passengers, passengers * residual])
+
+    def _evict(self, n):
+        idx = (self._head + np.arange(n)) % self.capacity
+        cells = (self._station[idx], self._bucket[idx])
+        np.subtract.at(self.residual_sum, cells, self._residual[idx])
+        np.subtract.at(self.count, cells, 1)
+        np.subtract.at(self.passenger_sum, cells, self._passengers[idx])
+        np.subtract.at(self.load_moments, self._station[idx], self._moments(self._passengers[idx], self._residual[idx]))
+        self._head = (self._head + n) % self.capacity
+        self._size -= n
+
+    def update(self, timestamps, stations, passenger_count, observed_dwell):
+        """Add a mini-batch of (timestamp, station, passenger_count, observed_dwell) records.
+
+        timestamps are seconds (any epoch, e.g. since midnight of the service day),
+        stations are names, observed_dwell is in seconds. Returns the number of live records.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return self._size
+        station_idx = np.array([self.index[name] for name in stations], dtype=np.int64)
+        passengers = np.asarray(passenger_count, dtype=float)
+        observed = np.asarray(observed_dwell, dtype=float)
+        if len(timestamps) > self.capacity:
+            keep = np.argsort(timestamps, kind="stable")[-self.capacity:]
+            timestamps, station_idx = timestamps[keep], station_idx[keep]
+            passengers, observed = passengers[keep], observed[keep]
+
+        minutes = (timestamps // 60) % MINUTES_PER_DAY
+        residual = observed - self.base.table[station_idx, minutes]
+        bucket = minutes // self.bucket_minutes
+
+        overflow = self._size + len(timestamps) - self.capacity
+        if overflow > 0:
+            self._evict(overflow)
+        slots = (self._head + self._size + np.arange(len(timestamps))) % self.capacity
+        self._time[slots] = timestamps
+        self._station[slots] = station_idx
+        self._bucket[slots] = bucket
+        self._residual[slots] = residual
+        self._passengers[slots] = passengers
+        self._size += len(timestamps)
+        np.add.at(self.residual_sum, (station_idx, bucket), residual)
+        np.add.at(self.count, (station_idx, bucket), 1)
+        np.add.at(self.passenger_sum, (station_idx, bucket), passengers)
+        np.add.at(self.load_moments, station_idx, self._moments(passengers, residual))
+
+        # Drop everything older than the rolling window (records arrive roughly in time order)
+        if self._size:
+            live = (self._head + np.arange(self._size)) % self.capacity
+            expired = np.argmax(self._time[live] >= timestamps.max() - self.window_seconds)
+            if expired:
+                self._evict(int(expired))
+
+        self._refresh()
+        return self._size
+
+    def _refresh(self):
+        correction = self.residual_sum / (self.count + self.prior_weight)
+        per_minute = np.repeat(correction, self.bucket_minutes, axis=1)[:, :MINUTES_PER_DAY]
+        self.table = self.base.table + per_minute
+
+        # Residual-on-load slope per station, shrunk towards 0 like the bucket means
+        n, p, r, pp, pr = self.load_moments.T
+        safe_n = np.maximum(n, 1)
+        sxx = np.maximum(pp - p * p / safe_n, 0)
+        sxy = pr - p * r / safe_n
+        self.slope = sxy / (sxx + self.prior_weight)
+        # Mean load of each bucket, the station's mean where the bucket has no records
+        station_mean = p / safe_n
+        self.load_mean = np.where(self.count > 0, self.passenger_sum / np.maximum(self.count, 1),
+                                  station_mean[:, None])
+
+    def lookup_load(self, station_idx, minutes, passengers):
+        """Dwell for arrays of stations and minutes given a live passenger count at each stop"""
+        minutes = np.asarray(minutes) % MINUTES_PER_DAY
+        load_gap = np.asarray(passengers, dtype=float) - self.load_mean[station_idx, minutes // self.bucket_minutes]
+        return self.table[station_idx, minutes] + self.slope[station_idx] * load_gap
+
+
+def inflow_records(path, station, base_dwell=30.0, per_passenger=0.6721):
+    """Observations from persondetedction.py's inflow_data.csv for one station.
+
+    The file only holds Timestamp and Person_Count, so the dwell is estimated with
+    the same passenger relation the synthetic training data uses. Returns the arguments
+    of OnlineDwellTable.update.
+    """
+    df = pd.read_csv(path)
+    parts = df["Timestamp"].astype(str).str.split(":", expand=True).astype(int)
+    seconds = parts[0] * 3600 + parts[1] * 60 + parts[2]
+    dwell = base_dwell + df["Person_Count"] * per_passenger
+    return seconds.to_numpy(), [station] * len(df), df["Person_Count"].to_numpy(), dwell.to_numpy()
@@ -0,0 +1,186 @@
+import os
+import re
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from metro_lines import LINES
+
+# ----------- Registry Settings -----------
+MODEL_VERSION = 1  # bump when generate_dwell_model changes so stale files are not reused
+DEFAULT_SEED = 42
+PEAK_HOURS = (8, 9, 17, 18)
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dwell_models")
+
+# Stations the registry serves line models for; anything else is rejected, not trained
+STATIONS = frozenset(s[0] for line in LINES.values() for s in line)
+
+# Synthetic dwell process: Poisson passenger load (peak / base), seconds per passenger,
+# uniform noise in [0, noise) s on top of the 30 s base, sampled every `freq`
+DwellProcess = namedtuple("DwellProcess", ["peak_hours", "peak_load", "base_load", "per_passenger", "noise", "freq"])
+
+
+def line_process(peak_hours=PEAK_HOURS):
+    """The process mltrainedlogic.py fits for every line station"""
+    return DwellProcess(tuple(peak_hours), 45, 20, 0.6721, 10, "3min")
+
+
+# Single-station studies with their own rush hours and coefficients: name -> (station, process)
+STUDIES = {
+    "generator": ("KASARVADVALI", DwellProcess((7, 9, 17, 18), 50, 20, 0.5, 15, "1min")),
+    "shreyascinema": ("SHREYAS CINEMA", DwellProcess((15, 23), 50, 20, 0.5, 15, "1min")),
+    "csvshreyascinema": ("CADBUARY", DwellProcess((6, 8, 9, 10, 17, 18, 19, 20), 50, 20, 0.6721, 15, "3min")),
+}
+
+_cache = {}
+
+
+def station_seed(station_name, seed=DEFAULT_SEED):
+    """Deterministic per-station seed (str hash() is randomized between runs, crc32 is not)"""
+    return (zlib.crc32(station_name.encode()) ^ seed) % (2 ** 32)
+
+
+# ----------- ML Dwell Time Model for Each Station -----------
+def synthetic_dwell_data(station_name, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, process=None):
+    """Synthetic passengers/dwell frame of a process (mltrainedlogic.py's by default), seeded"""
+    if process is None:
+        process = line_process(peak_hours)
+    rng = np.random.RandomState(station_seed(station_name, seed))
+    times = pd.date_range("05:00", "23:59", freq=process.freq)
+    passengers = np.where(
+        times.hour.isin(list(process.peak_hours)),
+        rng.poisson(process.peak_load, len(times)),
+        rng.poisson(process.base_load, len(times))
+    )
+    dwell = 30 + (passengers * process.per_passenger) + rng.randint(0, process.noise, len(times))
+    return pd.DataFrame({
+        "Station": station_name,
+        "Minutes": times.hour * 60 + times.minute,
+        "Passengers": passengers,
+        "Dwell_Time": dwell
+    })
+
+
+def generate_dwell_model(station_name, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, process=None):
+    df = synthetic_dwell_data(station_name, peak_hours, seed, process)
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(df[["Minutes"]].to_numpy(), df["Dwell_Time"].to_numpy())
+    return model
+
+
+def _fit_station(station_name, peak_hours, seed):
+    start = time.perf_counter()
+    model = generate_dwell_model(station_name, peak_hours, seed)
+    fit_seconds = time.perf_counter() - start
+    # Score against a fresh draw of the same process rather than the training rows
+    holdout = synthetic_dwell_data(station_name, peak_hours, seed + 1)
+    pred = model.predict(holdout[["Minutes"]].to_numpy())
+    mae = float(np.mean(np.abs(pred - holdout["Dwell_Time"].to_numpy())))
+    return station_name, model, fit_seconds, mae
+
+
+def model_path(station_name, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, model_dir=MODEL_DIR, study=None):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", station_name.strip()).strip("_").lower()
+    if study is not None:
+        return os.path.join(model_dir, f"{study}-{slug}-v{MODEL_VERSION}-seed{seed}.joblib")
+    hours = "_".join(str(h) for h in peak_hours)
+    return os.path.join(model_dir, f"{slug}-v{MODEL_VERSION}-seed{seed}-peak{hours}.joblib")
+
+
+def _dump(model, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Uncompressed: loading skips the decompression step
+    joblib.dump(model, path)
+
+
+def save_model(model, station_name, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, model_dir=MODEL_DIR):
+    path = model_path(station_name, peak_hours, seed, model_dir)
+    _dump(model, path)
+    return path
+
+
+# ----------- Cached Lookup -----------
+def _check_stations(station_names):
+    """Raise KeyError naming every station that is not on a line in metro_lines.LINES"""
+    unknown = [name for name in station_names if name not in STATIONS]
+    if unknown:
+        raise KeyError(f"not a station of any line in metro_lines.LINES: {', '.join(map(repr, unknown))}")
+
+
+def _cached(key, path, fit):
+    """In-process cache, then disk, then fit() and save"""
+    model = _cache.get(key)
+    if model is not None:
+        return model
+    if os.path.exists(path):
+        model = joblib.load(path)
+    else:
+        model = fit()
+        _dump(model, path)
+    _cache[key] = model
+    return model
+
+
+def get_dwell_model(station_name, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, model_dir=MODEL_DIR):
+    """Dwell model for a line station: in-process cache, then disk, then train and save"""
+    _check_stations([station_name])
+    peak_hours = tuple(peak_hours)
+    return _cached((station_name, peak_hours, seed, model_dir),
+                   model_path(station_name, peak_hours, seed, model_dir),
+                   lambda: generate_dwell_model(station_name, peak_hours, seed))
+
+
+def get_study_model(study, seed=DEFAULT_SEED, model_dir=MODEL_DIR):
+    """Dwell model of one of the STUDIES, fitted on that script's own process"""
+    if study not in STUDIES:
+        raise KeyError(f"unknown dwell study {study!r}; known: {', '.join(STUDIES)}")
+    station_name, process = STUDIES[study]
+    return _cached((study, seed, model_dir),
+                   model_path(station_name, seed=seed, model_dir=model_dir, study=study),
+                   lambda: generate_dwell_model(station_name, seed=seed, process=process))
+
+
+def get_dwell_models(station_names, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, model_dir=MODEL_DIR):
+    return {name: get_dwell_model(name, peak_hours, seed, model_dir) for name in station_names}
+
+
+# ----------- Parallel Training -----------
+def train_dwell_models(station_names, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, max_workers=None, model_dir=MODEL_DIR):
+    """Fit every station's model across a process pool, save and cache them.
+
+    Seeds are derived per station, so the models do not depend on max_workers.
+    Raises KeyError before any fitting if a name is not a line station.
+    Returns a DataFrame with the fit time and held-out MAE of each station.
+    """
+    peak_hours = tuple(peak_hours)
+    names = list(dict.fromkeys(station_names))
+    # Fail here, not inside a worker, on a misspelt station
+    _check_stations(names)
+    report = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fit_station, name, peak_hours, seed) for name in names]
+        for future in futures:
+            name, model, fit_seconds, mae = future.result()
+            save_model(model, name, peak_hours, seed, model_dir)
+            _cache[(name, peak_hours, seed, model_dir)] = model
+            report.append({"Station": name, "Fit_Seconds": fit_seconds, "MAE": mae})
+    return pd.DataFrame(report)
+
+
+def clear_cache():
+    _cache.clear()
+
+
+if __name__ == "__main__":
+    # Retrain every station of every line in one go (python dwell_registry.py)
+    all_stations = [s[0] for line in LINES.values() for s in line]
+    start = time.perf_counter()
+    report = train_dwell_models(all_stations)
+    print(report.to_string(index=False))
+    print(f"Trained {len(report)} station models in {time.perf_counter() - start:.1f} s")
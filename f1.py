@@ -1,5 +1,6 @@
+import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from sim_time import to_seconds, format_time_axis
 
 stations = [
     "GAIMUKH",
@@ -23,39 +24,46 @@ def get_dwell_time(station):
         return 30
 
 def simulate_train_round_trip(start_station_idx, direction=1, start_time_str="05:00"):
-    current_time = datetime.strptime(start_time_str, "%H:%M")
-    times = []
+    # Clock in seconds since midnight; the chart formats it
+    current_time = to_seconds(start_time_str)
+    station_idx = []
+    arrivals = []
+    departures = []
     idx = start_station_idx
     n = len(stations)
     # Forward journey
     while 0 <= idx < n:
         station = stations[idx]
         dwell = get_dwell_time(station)
-        arrival_time = current_time.strftime("%H:%M")
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
-        times.append((station, arrival_time, departure_time))
+        station_idx.append(idx)
+        arrivals.append(current_time)
+        current_time += dwell
+        departures.append(current_time)
         # Travel to next station
         if (direction == 1 and idx < n-1) or (direction == -1 and idx > 0):
-            current_time += timedelta(seconds=120)
+            current_time += 120
         idx += direction
     # At terminal, turnaround
-    current_time += timedelta(seconds=180)
+    current_time += 180
     # Reverse journey
     direction = -direction
     idx -= direction  # Move to previous station (start moving back)
     while (0 <= idx < n) and (idx != start_station_idx - direction):
         station = stations[idx]
         dwell = get_dwell_time(station)
-        arrival_time = current_time.strftime("%H:%M")
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
-        times.append((station, arrival_time, departure_time))
+        station_idx.append(idx)
+        arrivals.append(current_time)
+        current_time += dwell
+        departures.append(current_time)
         # Travel to next station
         if (direction == 1 and idx < n-1) or (direction == -1 and idx > 0):
-            current_time += timedelta(seconds=120)
+            current_time += 120
         idx += direction
-    return times
+    return {
+        "Station": np.array(station_idx, dtype=np.int32),
+        "Arrival": np.array(arrivals, dtype=np.int32),
+        "Departure": np.array(departures, dtype=np.int32),
+    }
 
 # Simulate 7 round-trip trains
 train1 = simulate_train_round_trip(0, direction=1, start_time_str="05:00")
@@ -70,23 +78,12 @@ train7 = simulate_train_round_trip(kapurbawdi_idx, direction=-1, start_time_str=
 def plot_control_chart_7trains(*train_lists, labels, colors):
     plt.figure(figsize=(14, 7))
     for train, label, color in zip(train_lists, labels, colors):
-        x = []
-        y = []
-        for i, (station, arr, dep) in enumerate(train):
-            station_idx = stations.index(station)
-            # Flat line for dwell (waiting)
-            x.append(datetime.strptime(arr, "%H:%M"))
-            y.append(station_idx)
-            x.append(datetime.strptime(dep, "%H:%M"))
-            y.append(station_idx)
-            # Slope for movement (if not last station in direction)
-            if i < len(train) - 1:
-                next_station, next_arr, _ = train[i+1]
-                next_station_idx = stations.index(next_station)
-                x.append(datetime.strptime(next_arr, "%H:%M"))
-                y.append(next_station_idx)
+        # Flat line for dwell (waiting), slope for movement to the next arrival
+        x = np.column_stack([train["Arrival"], train["Departure"]]).ravel()
+        y = np.repeat(train["Station"], 2)
         plt.plot(x, y, label=label, marker="o", color=color)
     plt.yticks(range(len(stations)), stations)
+    format_time_axis(plt.gca())
     plt.xlabel("Time")
     plt.ylabel("Stations")
     plt.title("Control Chart for 7 Trains (Round Trip, Flat = Waiting, Slope = Moving)")
@@ -1,8 +1,8 @@
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestRegressor
-from datetime import datetime, timedelta
+from sim_time import to_seconds
+from dwell_registry import get_dwell_models
+from dwell_lookup import compile_dwell_table
+from fleet_sim import simulate_fleet
 
 # ----------- Metro Station Data -----------
 stations_data = [
@@ -19,115 +19,37 @@ stations_data = [
 ]
 stations = [s[0] for s in stations_data]
 
-# ----------- Run Time Calculation -----------
-def calculate_run_time(distance, civil_speed):
-    if distance == 0:
-        return 0
-    vmax_kmph = 38.0 if distance > 800 else 33.0
-    vmax_kmph = min(vmax_kmph, civil_speed)
-    vmax = vmax_kmph * 1000 / 3600
-    brake_distance = 150.0
-    buffer_distance = 50.0
-    accelerating_distance = distance / 8.0
-    accel = vmax ** 2 / (2 * accelerating_distance)
-    t_accel = vmax / accel
-    t_decel = np.sqrt(2 * (brake_distance + buffer_distance) / accel)
-    d_cruise = distance - accelerating_distance - brake_distance
-    t_cruise = d_cruise / vmax if d_cruise > 0 else 0
-    if d_cruise < 0:
-        d_half = max(distance - brake_distance, distance / 2.0)
-        v_peak = np.sqrt(2 * accel * d_half)
-        t_accel = v_peak / accel
-        t_decel = np.sqrt(2 * brake_distance / accel)
-        t_cruise = 0
-    return t_accel + t_cruise + t_decel  # in seconds
-
-# ----------- ML Dwell Time Model for Each Station -----------
-def generate_dwell_model(station_name, peak_hours):
-    times = pd.date_range("05:00", "23:59", freq="3min")
-    passengers = np.where(
-        times.hour.isin(peak_hours),
-        np.random.poisson(45, len(times)),
-        np.random.poisson(20, len(times))
-    )
-    dwell = 30 + (passengers * 0.6721) + np.random.randint(0, 10, len(times))
-    df = pd.DataFrame({
-        "Station": station_name,
-        "Minutes": times.hour * 60 + times.minute,
-        "Dwell_Time": dwell
-    })
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(df[["Minutes"]], df["Dwell_Time"])
-    return model
-
-ml_models = {
-    station: generate_dwell_model(station, peak_hours=[8, 9, 17, 18])
-    for station in stations
-}
-
-def get_ml_dwell(station, terminal_station, current_time):
-    if station == terminal_station:
-        return 180  # Turnaround at terminal
-    minutes = current_time.hour * 60 + current_time.minute
-    dwell = ml_models[station].predict(pd.DataFrame({"Minutes": [minutes]}))[0]
-    return max(dwell, 15)
-
-# ----------- Round Trip Simulation -----------
-def simulate_train_round_trip_ml(start_station_idx, direction=1, start_time_str="05:00", train_id="Train"):
-    current_time = datetime.strptime(start_time_str, "%H:%M")
-    times = []
-    idx = start_station_idx
-    n = len(stations)
-    terminal_station = stations[0] if direction == -1 else stations[-1]
-    
-    # Forward journey
-    while 0 <= idx < n:
-        station = stations[idx]
-        dwell = get_ml_dwell(station, terminal_station, current_time)
-        arrival_time = current_time.strftime("%H:%M")
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
-        times.append((train_id, station, arrival_time, departure_time))
-        if (direction == 1 and idx < n - 1) or (direction == -1 and idx > 0):
-            to_idx = idx + direction
-            dist = abs(stations_data[to_idx][1])
-            speed = stations_data[to_idx][3]
-            current_time += timedelta(seconds=calculate_run_time(dist, speed))
-        idx += direction
-
-    # Reverse journey
-    idx -= direction
-    direction = -direction
-    terminal_station = stations[start_station_idx]
-    idx += direction
-    while 0 <= idx < n:
-        station = stations[idx]
-        dwell = get_ml_dwell(station, terminal_station, current_time)
-        arrival_time = current_time.strftime("%H:%M")
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
-        times.append((train_id, station, arrival_time, departure_time))
-        if (direction == 1 and idx < n - 1) or (direction == -1 and idx > 0):
-            to_idx = idx + direction
-            dist = abs(stations_data[to_idx][1])
-            speed = stations_data[to_idx][3]
-            current_time += timedelta(seconds=calculate_run_time(dist, speed))
-        idx += direction
-    
-    return times
+# ----------- ML Dwell Time Lookup Table -----------
+dwell_table = compile_dwell_table(get_dwell_models(stations))
 
 # ----------- Simulate 7 Trains -----------
-all_train_runs = []
-all_train_runs.extend(simulate_train_round_trip_ml(0, 1, "05:00", "Train 1"))
-all_train_runs.extend(simulate_train_round_trip_ml(0, 1, "05:05", "Train 2"))
-all_train_runs.extend(simulate_train_round_trip_ml(0, 1, "05:10", "Train 3"))
-all_train_runs.extend(simulate_train_round_trip_ml(len(stations)-1, -1, "05:00", "Train 4"))
-all_train_runs.extend(simulate_train_round_trip_ml(len(stations)-1, -1, "05:05", "Train 5"))
-all_train_runs.extend(simulate_train_round_trip_ml(len(stations)-1, -1, "05:10", "Train 6"))
-all_train_runs.extend(simulate_train_round_trip_ml(0, 1, "05:15", "Train 7"))
-
-# Convert to DataFrame
-df_trains = pd.DataFrame(all_train_runs, columns=["Train", "Station", "Arrival", "Departure"])
+# The whole fleet advances one stop per vectorized step: ML dwell (at least 15 s) at
+# every stop, 180 s turnaround at the end of each leg, optimized-profile run times
+# from the segment table.
+trains = [
+    ("Train 1", 0, 1, "05:00"),
+    ("Train 2", 0, 1, "05:05"),
+    ("Train 3", 0, 1, "05:10"),
+    ("Train 4", len(stations)-1, -1, "05:00"),
+    ("Train 5", len(stations)-1, -1, "05:05"),
+    ("Train 6", len(stations)-1, -1, "05:10"),
+    ("Train 7", 0, 1, "05:15"),
+]
+stop_log = simulate_fleet(
+    stations_data,
+    start_stations=[t[1] for t in trains],
+    directions=[t[2] for t in trains],
+    start_times=[to_seconds(t[3]) for t in trains],
+    train_ids=[t[0] for t in trains],
+    legs=2,
+    profile="optimized",
+    dwell_table=dwell_table,
+    min_dwell=15,
+    terminal_dwell=180,
+)
+
+# Convert to DataFrame (strings only at export)
+df_trains = stop_log.to_frame()
 
 # Display first few rows
 print(df_trains.head(20))
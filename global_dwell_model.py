@@ -0,0 +1,75 @@
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from dwell_registry import DEFAULT_SEED, PEAK_HOURS, synthetic_dwell_data
+
+FEATURES = ["Station_ID", "Direction", "Hour", "Minutes", "Peak", "Passengers"]
+MAX_LEAF_NODES = 256  # per tree; caps the forest at a few MB whatever the station count
+
+
+# ----------- One Model for Every Station -----------
+class GlobalDwellModel:
+    """Single RandomForest over station, direction, hour, peak flag and passenger count"""
+
+    def __init__(self, station_names, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, max_leaf_nodes=MAX_LEAF_NODES):
+        self.stations = list(dict.fromkeys(station_names))
+        self.index = {name: i for i, name in enumerate(self.stations)}
+        self.peak_hours = tuple(peak_hours)
+        self.seed = seed
+        self.max_leaf_nodes = max_leaf_nodes
+        self.model = None
+
+    def training_frame(self):
+        """Stack the per-station synthetic frames, one draw per station and direction"""
+        frames = []
+        for name in self.stations:
+            for direction in (1, -1):
+                seed = self.seed if direction == 1 else self.seed + 1
+                df = synthetic_dwell_data(name, self.peak_hours, seed)
+                df["Station_ID"] = self.index[name]
+                df["Direction"] = direction
+                frames.append(df)
+        df = pd.concat(frames, ignore_index=True)
+        df["Hour"] = df["Minutes"] // 60
+        df["Peak"] = df["Hour"].isin(self.peak_hours).astype(int)
+        return df
+
+    def fit(self, df=None):
+        if df is None:
+            df = self.training_frame()
+        # A fixed leaf budget per tree, not the leaf size, keeps memory flat as stations are added:
+        # with min_samples_leaf alone the leaf count grows with the number of training rows
+        self.model = RandomForestRegressor(n_estimators=100, max_leaf_nodes=self.max_leaf_nodes,
+                                           min_samples_leaf=5, random_state=42, n_jobs=-1)
+        self.model.fit(df[FEATURES].to_numpy(), df["Dwell_Time"].to_numpy())
+        return self
+
+    def features(self, station_ids, directions, minutes, passengers=None):
+        minutes = np.asarray(minutes) % 1440
+        station_ids, directions, minutes = np.broadcast_arrays(station_ids, directions, minutes)
+        hour = minutes // 60
+        peak = np.isin(hour, self.peak_hours).astype(int)
+        if passengers is None:
+            # Expected load when no live count is available (means of the synthetic Poisson draws)
+            passengers = np.where(peak == 1, 45, 20)
+        passengers = np.broadcast_to(passengers, minutes.shape)
+        return np.column_stack([a.ravel() for a in (station_ids, directions, hour, minutes, peak, passengers)])
+
+    def predict(self, station_ids, directions, minutes, passengers=None):
+        """Batched dwell prediction for arrays of stops (a trip, a timetable or a whole day)"""
+        shape = np.broadcast(station_ids, directions, minutes).shape
+        X = self.features(station_ids, directions, minutes, passengers)
+        return self.model.predict(X).reshape(shape)
+
+    def predict_stops(self, station_names, directions, minutes, passengers=None):
+        station_ids = np.array([self.index[name] for name in station_names])
+        return self.predict(station_ids, directions, minutes, passengers)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
@@ -0,0 +1,99 @@
+import numpy as np
+
+from metro_lines import GAIMUKH_CADBUARY
+from segment_table import get_segment_table
+
+# Actions per train: keep normal speed, speed boost (35->38 km/h profile), or hold at the platform
+NORMAL, BOOST, HOLD = 0, 1, 2
+
+
+# ----------- Batched Headway-Control Environment -----------
+class HeadwayEnv:
+    """n_envs independent copies of a line with n_trains running one direction.
+
+    All trains advance one stop per step. Observation per train: headway deviation
+    from the target at the last departure (s) and predicted dwell at the next stop (s),
+    shape (n_envs, n_trains, 2). Actions have shape (n_envs, n_trains).
+    A train may not arrive until the train ahead left the platform safe_headway earlier.
+    """
+
+    def __init__(self, n_envs=1024, n_trains=7, stations=GAIMUKH_CADBUARY, headway=300.0,
+                 start_time=8 * 3600, dwell_table=None, dwell_noise=0.25, hold_seconds=20.0,
+                 boost_cost=0.05, seed=None):
+        self.n_envs = n_envs
+        self.n_trains = n_trains
+        self.n_stations = len(stations)
+        self.headway = headway
+        self.start_time = start_time
+        self.dwell_noise = dwell_noise
+        self.hold_seconds = hold_seconds
+        self.boost_cost = boost_cost
+        self.rng = np.random.default_rng(seed)
+
+        segments = get_segment_table(stations)
+        self.run_normal = segments.run_times[(1, "normal")]
+        self.run_boost = segments.run_times[(1, "optimized")]
+        self.safe_headway = segments.safe_headways[(1, "normal")]
+        self.base_dwell = np.array([s[2] for s in stations], dtype=float)
+        if dwell_table is not None:
+            self.dwell_rows = np.array([dwell_table.index[s[0]] for s in stations])
+        self.dwell_table = dwell_table
+
+        self.departure = np.zeros((n_envs, n_trains))
+        self.station = np.zeros(n_envs, dtype=np.int64)
+
+    def predicted_dwell(self, station, times):
+        """Predicted dwell at station index (n_envs,) for times (n_envs, n_trains)"""
+        if self.dwell_table is None:
+            return np.broadcast_to(self.base_dwell[station][:, None], times.shape)
+        minutes = (times // 60).astype(np.int64)
+        return self.dwell_table.lookup(self.dwell_rows[station][:, None], minutes)
+
+    def _reset_envs(self, envs):
+        k = np.arange(self.n_trains)
+        jitter = self.rng.normal(0.0, 0.1 * self.headway, (len(envs), self.n_trains))
+        jitter[:, 0] = 0.0
+        self.departure[envs] = self.start_time + k * self.headway + jitter
+        self.station[envs] = 0
+
+    def reset(self):
+        self._reset_envs(np.arange(self.n_envs))
+        return self.observation()
+
+    def observation(self):
+        deviation = np.zeros((self.n_envs, self.n_trains))
+        deviation[:, 1:] = np.diff(self.departure, axis=1) - self.headway
+        # Finished envs are reset inside step(), so every env has a next stop here
+        eta = self.departure + self.run_normal[self.station][:, None]
+        dwell = self.predicted_dwell(self.station + 1, eta)
+        return np.stack([deviation, dwell], axis=-1)
+
+    def step(self, actions):
+        """Advance every train one stop; returns (obs, reward, done). Finished envs are reset."""
+        actions = np.asarray(actions)
+        seg = self.station
+        run = np.where(actions == BOOST, self.run_boost[seg][:, None], self.run_normal[seg][:, None])
+        arrival = self.departure + run
+        nxt = seg + 1
+
+        dwell = self.predicted_dwell(nxt, arrival)
+        dwell = dwell * self.rng.lognormal(0.0, self.dwell_noise, dwell.shape)
+        hold = np.where(actions == HOLD, self.hold_seconds, 0.0)
+
+        # Trains are ordered; each one waits for the platform to clear behind the train ahead
+        safe = self.safe_headway[seg][:, None]
+        departure = np.empty_like(arrival)
+        departure[:, 0] = arrival[:, 0] + dwell[:, 0] + hold[:, 0]
+        for k in range(1, self.n_trains):
+            arrival[:, k] = np.maximum(arrival[:, k], departure[:, k - 1] + safe[:, 0])
+            departure[:, k] = arrival[:, k] + dwell[:, k] + hold[:, k]
+
+        self.departure = departure
+        self.station = nxt
+        gaps = np.diff(departure, axis=1)
+        reward = -np.abs(gaps - self.headway).mean(axis=1) / 60.0 - self.boost_cost * (actions == BOOST).sum(axis=1)
+
+        done = self.station >= self.n_stations - 1
+        if done.any():
+            self._reset_envs(np.flatnonzero(done))
+        return self.observation(), reward, done
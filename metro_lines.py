@@ -0,0 +1,57 @@
+# ----------- Line Definitions -----------
+# Each station is (name, distance from previous station in m, dwell in s, civil speed in km/h),
+# the same layout as `stations` in mltrainedlogic.py and `stations_data` in f3.py.
+
+GAIMUKH_CADBUARY = [
+    ("GAIMUKH", 0.0, 180, 35),
+    ("GOWNIWADA", 1502.229, 30, 45),
+    ("KASARVADVALI", 1385.394, 30, 45),
+    ("VIJAYGARDEN", 1024.036, 30, 45),
+    ("DONGARI PADA", 1198.778, 30, 45),
+    ("TIKUJI NI WADI", 1226.694, 30, 45),
+    ("MANPADA", 758.992, 30, 45),
+    ("KAPURBAWDI", 815.824, 30, 45),
+    ("MAJIWADA", 1453.707, 30, 45),
+    ("CADBUARY JUNCTION", 824.707, 180, 45)
+]
+
+# Line 4 from updated.py / data_1.py, with the distance-to-next column shifted onto the next station
+LINE4 = [
+    ("BHAKTI PARK METRO", 0.0, 30, 45),
+    ("WADALA TT", 1014.37, 30, 45),
+    ("ANIKNAGARBUSDEPOT", 916.806, 30, 45),
+    ("SIDDHARTHCOLONY", 1651.48, 30, 45),
+    ("GARODIA NAGAR", 2421.413, 30, 45),
+    ("PANT NAGAR", 1662.149, 30, 45),
+    ("LAXMINAGAR", 1148.172, 30, 45),
+    ("SHREYAS CINEMA", 952.884, 30, 45),
+    ("GODREJ COMPANY", 745.313, 30, 45),
+    ("VIKHROLI METRO", 709.649, 30, 45),
+    ("SURYA NAGAR", 1017.761, 30, 45),
+    ("GANDHINGAR", 973.585, 30, 45),
+    ("NAVAL HOUSING", 747.0, 30, 45),
+    ("BHANDUP MAHAPALIKA", 745.156, 30, 45),
+    ("BHANDUP METRO", 1039.865, 30, 45),
+    ("SHANGRILLA", 797.654, 30, 45),
+    ("SONAPUR", 1454.303, 30, 45),
+    ("MULUND FIRE STATION", 1124.344, 30, 45),
+    ("MULUND NAKA", 1339.919, 30, 45),
+    ("TEEN HAATH NAKA", 1212.231, 30, 45),
+    ("RTO THANE", 784.465, 30, 45),
+    ("MAHAPALIKAMARG", 964.956, 30, 45),
+    ("CADBUARY JUNCTION", 795.993, 30, 45),
+    ("MAJIWADA", 824.707, 30, 45),
+    ("KAPURBAWDI", 1445.707, 30, 45),
+    ("MANPADA", 815.824, 30, 45),
+    ("TIKUJI NI WADI", 758.992, 30, 45),
+    ("DONGARI PADA", 1226.694, 30, 45),
+    ("VIJAYGARDEN", 1198.778, 30, 45),
+    ("KASARVADVALI", 1024.036, 30, 45),
+    ("GOWNIWADA", 1385.394, 30, 45),
+    ("GAIMUKH", 1502.229, 30, 45),
+]
+
+LINES = {
+    "GAIMUKH_CADBUARY": GAIMUKH_CADBUARY,
+    "LINE4": LINE4,
+}
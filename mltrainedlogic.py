@@ -1,8 +1,8 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestRegressor
-from datetime import datetime, timedelta
+from sim_time import MISSING, to_seconds, round_seconds, format_time_axis
+from segment_table import get_segment_table
+from dwell_registry import get_dwell_models
 
 # ----------- Metro Station Data (from C++ code) -----------
 stations = [
@@ -18,186 +18,147 @@ stations = [
     ("CADBUARY JUNCTION", 824.707, 180, 45)
 ]
 
-def calculate_run_time(distance, civil_speed, optimized=False):
-
-    if optimized:
-        vmax_kmph = 38.0 if distance > 800 else 33.0
-    else:
-        vmax_kmph = 35.0 if distance > 800 else 30.0
-    vmax_kmph = min(vmax_kmph, civil_speed)
-    vmax = vmax_kmph * 1000 / 3600
-    brake_distance = 150.0
-    buffer_distance = 50.0
-
-    accelerating_distance = distance / 8.0
-    accel = vmax ** 2 / (2 * accelerating_distance)
-    t_accel = vmax / accel
-    t_decel = np.sqrt(2 * (brake_distance + buffer_distance) / accel)
-
-    d_cruise = distance - accelerating_distance - brake_distance
-    t_cruise = d_cruise / vmax if d_cruise > 0 else 0
-
-    if d_cruise < 0:
-        d_half = max(distance - brake_distance, distance / 2.0)
-        v_peak = np.sqrt(2 * accel * d_half)
-        t_accel = v_peak / accel
-        t_decel = np.sqrt(2 * brake_distance / accel)
-        t_cruise = 0
-
-    return t_accel + t_cruise + t_decel  # in seconds
-
-# ----------- ML Dwell Time Model for Each Station -----------
-def generate_dwell_model(station_name, peak_hours):
-    times = pd.date_range("05:00", "23:59", freq="3min")
-    passengers = np.where(
-        times.hour.isin(peak_hours),
-        np.random.poisson(45, len(times)),
-        np.random.poisson(20, len(times))
-    )
-    dwell = 30 + (passengers * 0.6721) + np.random.randint(0, 10, len(times))
-    df = pd.DataFrame({
-        "Station": station_name,
-        "Minutes": times.hour * 60 + times.minute,
-        "Dwell_Time": dwell
-    })
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
-    model.fit(df[["Minutes"]], df["Dwell_Time"])
-    return model
-
 # ----------- Simulate Train Movement for Both Scenarios -----------
+# Clocks are seconds since midnight; a trip is returned as arrays of station index,
+# arrival and departure (int32 seconds, MISSING where the stop has none)
+def trip_arrays(station_idx, arrivals, departures=None):
+    trip = {"Station": np.array(station_idx, dtype=np.int32), "Arrival": round_seconds(arrivals)}
+    if departures is not None:
+        trip["Departure"] = round_seconds(departures)
+    return trip
+
 def simulate_train(start_time_str, use_ml=False):
-    times = []
-    current_time = datetime.strptime(start_time_str, "%H:%M")
+    station_idx, arrivals = [], []
+    current_time = float(to_seconds(start_time_str))
+    segments = get_segment_table(stations)
 
-    ml_models = {
-        station[0]: generate_dwell_model(station[0], peak_hours=[8,9,17,18])
-        for station in stations
-    }
+    ml_models = get_dwell_models([station[0] for station in stations], peak_hours=[8,9,17,18])
 
     for i in range(len(stations)-1):
         from_station, _, _, _ = stations[i]
         to_station, distance, base_dwell, civil_speed = stations[i+1]
 
         # Runtime calculation from C++
-        runtime = calculate_run_time(distance, civil_speed)
-        current_time += timedelta(seconds=runtime)
+        runtime = segments[(from_station, to_station, 1, "normal")].run_time
+        current_time += runtime
 
-        dwell = ml_models[to_station].predict([[current_time.hour * 60 + current_time.minute]])[0] if use_ml else base_dwell
+        dwell = ml_models[to_station].predict([[int(current_time // 60)]])[0] if use_ml else base_dwell
         dwell = max(dwell, 15)
-        times.append((to_station, current_time.strftime("%H:%M")))
-        current_time += timedelta(seconds=dwell)
+        station_idx.append(i + 1)
+        arrivals.append(current_time)
+        current_time += dwell
 
-    return times
+    return trip_arrays(station_idx, arrivals)
 
 def simulate_train_full_times(start_time_str, use_ml=False):
-    times = []
-    current_time = datetime.strptime(start_time_str, "%H:%M")
+    station_idx, arrivals, departures = [0], [MISSING], []
+    current_time = float(to_seconds(start_time_str))
+    segments = get_segment_table(stations)
 
-    ml_models = {
-        station[0]: generate_dwell_model(station[0], peak_hours=[8,9,17,18])
-        for station in stations
-    }
+    ml_models = get_dwell_models([station[0] for station in stations], peak_hours=[8,9,17,18])
 
     # First station: departure only
-    times.append((stations[0][0], None, current_time.strftime("%H:%M")))  # (station, arrival, departure)
+    departures.append(current_time)
 
     for i in range(len(stations)-1):
         from_station, _, _, _ = stations[i]
         to_station, distance, base_dwell, civil_speed = stations[i+1]
 
         # Runtime calculation from C++ logic
-        runtime = calculate_run_time(distance, civil_speed)
-        current_time += timedelta(seconds=runtime)
-        arrival_time = current_time.strftime("%H:%M")
+        runtime = segments[(from_station, to_station, 1, "normal")].run_time
+        current_time += runtime
+        arrival_time = current_time
 
-        dwell = ml_models[to_station].predict([[current_time.hour * 60 + current_time.minute]])[0] if use_ml else base_dwell
+        dwell = ml_models[to_station].predict([[int(current_time // 60)]])[0] if use_ml else base_dwell
         dwell = max(dwell, 15)
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
+        current_time += dwell
 
-        times.append((to_station, arrival_time, departure_time))
+        station_idx.append(i + 1)
+        arrivals.append(arrival_time)
+        departures.append(current_time)
 
-    return times
+    return trip_arrays(station_idx, arrivals, departures)
 
 def simulate_train_full_times_optimized(start_time_str, use_ml=True):
-    times = []
-    current_time = datetime.strptime(start_time_str, "%H:%M")
+    station_idx, arrivals, departures = [0], [MISSING], []
+    current_time = float(to_seconds(start_time_str))
+    segments = get_segment_table(stations)
 
-    ml_models = {
-        station[0]: generate_dwell_model(station[0], peak_hours=[8,9,17,18])
-        for station in stations
-    }
+    ml_models = get_dwell_models([station[0] for station in stations], peak_hours=[8,9,17,18])
 
     # First station: departure only
-    times.append((stations[0][0], None, current_time.strftime("%H:%M")))
+    departures.append(current_time)
 
     for i in range(len(stations)-1):
         from_station, _, _, _ = stations[i]
         to_station, distance, base_dwell, civil_speed = stations[i+1]
 
         # Use optimized speed
-        runtime = calculate_run_time(distance, civil_speed, optimized=True)
-        current_time += timedelta(seconds=runtime)
-        arrival_time = current_time.strftime("%H:%M")
+        runtime = segments[(from_station, to_station, 1, "optimized")].run_time
+        current_time += runtime
+        arrival_time = current_time
 
-        dwell = ml_models[to_station].predict([[current_time.hour * 60 + current_time.minute]])[0] if use_ml else base_dwell
+        dwell = ml_models[to_station].predict([[int(current_time // 60)]])[0] if use_ml else base_dwell
         dwell = max(dwell, 15)
-        current_time += timedelta(seconds=dwell)
-        departure_time = current_time.strftime("%H:%M")
+        current_time += dwell
 
-        times.append((to_station, arrival_time, departure_time))
+        station_idx.append(i + 1)
+        arrivals.append(arrival_time)
+        departures.append(current_time)
 
-    return times
+    return trip_arrays(station_idx, arrivals, departures)
 
 def simulate_train_full_times_optimized_conditional(start_time_str):
-    times = []
-    current_time = datetime.strptime(start_time_str, "%H:%M")
+    station_idx, arrivals, departures = [0], [MISSING], []
+    current_time = float(to_seconds(start_time_str))
+    segments = get_segment_table(stations)
 
-    ml_models = {
-        station[0]: generate_dwell_model(station[0], peak_hours=[8,9,17,18])
-        for station in stations
-    }
+    ml_models = get_dwell_models([station[0] for station in stations], peak_hours=[8,9,17,18])
 
     # First station: departure only
-    times.append((stations[0][0], None, current_time.strftime("%H:%M")))
+    departures.append(current_time)
 
     for i in range(len(stations)-1):
         from_station, _, _, _ = stations[i]
         to_station, distance, base_dwell, civil_speed = stations[i+1]
 
         # Predict ML dwell
-        ml_dwell = ml_models[to_station].predict([[current_time.hour * 60 + current_time.minute]])[0]
+        ml_dwell = ml_models[to_station].predict([[int(current_time // 60)]])[0]
         ml_dwell = max(ml_dwell, 15)
 
         # If ML dwell > fixed dwell, use optimized speed, else use normal speed
         if ml_dwell > base_dwell:
-            runtime = calculate_run_time(distance, civil_speed, optimized=True)
+            runtime = segments[(from_station, to_station, 1, "optimized")].run_time
         else:
-            runtime = calculate_run_time(distance, civil_speed, optimized=False)
+            runtime = segments[(from_station, to_station, 1, "normal")].run_time
 
-        current_time += timedelta(seconds=runtime)
-        arrival_time = current_time.strftime("%H:%M")
+        current_time += runtime
+        arrival_time = current_time
 
         # Always use ML dwell for the dwell time
-        current_time += timedelta(seconds=ml_dwell)
-        departure_time = current_time.strftime("%H:%M")
+        current_time += ml_dwell
 
-        times.append((to_station, arrival_time, departure_time))
+        station_idx.append(i + 1)
+        arrivals.append(arrival_time)
+        departures.append(current_time)
 
-    return times
+    return trip_arrays(station_idx, arrivals, departures)
 
 # ----------- Plot Control Chart -----------
+def stop_points(train):
+    """Arrival then departure of every stop as (seconds, station index), MISSING times dropped"""
+    x = np.column_stack([train["Arrival"], train["Departure"]]).ravel()
+    y = np.repeat(train["Station"], 2)
+    return x[x != MISSING], y[x != MISSING]
+
 def plot_control_chart(fixed_times, ml_times):
     station_names = [s[0] for s in stations[1:]]
-    y = list(range(len(station_names)))
-
-    fixed_x = [datetime.strptime(t, "%H:%M") for _, t in fixed_times]
-    ml_x = [datetime.strptime(t, "%H:%M") for _, t in ml_times]
 
     plt.figure(figsize=(14, 6))
-    plt.plot(fixed_x, y, label="Fixed Dwell Time", marker="o", color="blue")
-    plt.plot(ml_x, y, label="Predicted Dwell Time", marker="o", color="red")
-    plt.yticks(y, station_names)
+    plt.plot(fixed_times["Arrival"], fixed_times["Station"], label="Fixed Dwell Time", marker="o", color="blue")
+    plt.plot(ml_times["Arrival"], ml_times["Station"], label="Predicted Dwell Time", marker="o", color="red")
+    plt.yticks(range(1, len(stations)), station_names)
+    format_time_axis(plt.gca())
     plt.xlabel("Time")
     plt.ylabel("Stations")
     plt.title("Control Chart (Single Train from 8:00 AM)")
@@ -208,35 +169,18 @@ def plot_control_chart(fixed_times, ml_times):
 
 def plot_control_chart_full(fixed_times, ml_times):
     station_names = [s[0] for s in stations]
-    y = []
-    x = []
 
     # Fixed dwell time
-    for idx, (station, arr, dep) in enumerate(fixed_times):
-        if arr is not None:
-            x.append(datetime.strptime(arr, "%H:%M"))
-            y.append(idx)
-        if dep is not None:
-            x.append(datetime.strptime(dep, "%H:%M"))
-            y.append(idx)
-
+    x, y = stop_points(fixed_times)
     plt.figure(figsize=(14, 6))
     plt.step(x, y, where='post', label="Fixed Dwell Time", marker="o", color="blue")
 
     # ML dwell time
-    y_ml = []
-    x_ml = []
-    for idx, (station, arr, dep) in enumerate(ml_times):
-        if arr is not None:
-            x_ml.append(datetime.strptime(arr, "%H:%M"))
-            y_ml.append(idx)
-        if dep is not None:
-            x_ml.append(datetime.strptime(dep, "%H:%M"))
-            y_ml.append(idx)
-
+    x_ml, y_ml = stop_points(ml_times)
     plt.step(x_ml, y_ml, where='post', label="Predicted Dwell Time", marker="o", color="red")
 
     plt.yticks(range(len(station_names)), station_names)
+    format_time_axis(plt.gca())
     plt.xlabel("Time")
     plt.ylabel("Stations")
     plt.title("Control Chart (Flat = Waiting, Slope = Running)")
@@ -271,17 +215,10 @@ def plot_multiple_trains(*train_lists, labels, colors):
     station_names = [s[0] for s in stations]
     plt.figure(figsize=(14, 6))
     for train, label, color in zip(train_lists, labels, colors):
-        y = []
-        x = []
-        for idx, (station, arr, dep) in enumerate(train):
-            if arr is not None:
-                x.append(datetime.strptime(arr, "%H:%M"))
-                y.append(idx)
-            if dep is not None:
-                x.append(datetime.strptime(dep, "%H:%M"))
-                y.append(idx)
+        x, y = stop_points(train)
         plt.step(x, y, where='post', label=label, marker="o", color=color)
     plt.yticks(range(len(station_names)), station_names)
+    format_time_axis(plt.gca())
     plt.xlabel("Time")
     plt.ylabel("Stations")
     plt.title("Control Chart for Two Trains (Flat = Waiting, Slope = Running)")
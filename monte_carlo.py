@@ -0,0 +1,270 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dwell_registry import DEFAULT_SEED
+from event_engine import EventEngine
+from metro_lines import GAIMUKH_CADBUARY
+from segment_table import get_segment_table
+from sim_time import to_seconds
+
+# The seven round trips of f3.py / f5.py: (train, start station index, direction, start time)
+F5_TRAINS = [
+    ("Train 1", 0, 1, "05:00"),
+    ("Train 2", 0, 1, "05:05"),
+    ("Train 3", 0, 1, "05:10"),
+    ("Train 4", -1, -1, "05:00"),
+    ("Train 5", -1, -1, "05:05"),
+    ("Train 6", -1, -1, "05:10"),
+    ("Train 7", 0, 1, "05:15"),
+]
+
+LATENESS_BINS = np.arange(-600.0, 3600.0 + 5.0, 5.0)  # s, terminal arrival vs plan
+HEADWAY_BINS = np.arange(0.0, 900.0 + 2.0, 2.0)  # s, mean |headway deviation| of a day
+BOOST_BINS = np.arange(0.0, 1001.0)  # boosted segments per day
+
+
+# ----------- One Simulated Day -----------
+MIN_DWELL = 15.0  # s, floor on model dwells, as in f5.py
+
+
+class PlannedDay(EventEngine):
+    """EventEngine with the median dwell of the model a SampledDay draws from.
+
+    With a DwellQuantileTable the dwell is its P50 (at least min_dwell), else the
+    timetable dwell, the median of the lognormal factor. Terminals keep their timetable
+    (turnaround) dwell, as in f5.py. A sampled day is measured against this plan, so
+    lateness and boosts come from the spread of the dwells, not from a change of model.
+    """
+
+    def __init__(self, stations, dwell_quantiles=None, min_dwell=MIN_DWELL, turnaround=0.0, **kwargs):
+        super().__init__(stations, turnaround=turnaround, **kwargs)
+        self.dwell_quantiles = dwell_quantiles
+        self.min_dwell = min_dwell
+        if dwell_quantiles is not None:
+            self.quantile_rows = [dwell_quantiles.index[s[0]] for s in stations]
+
+    def terminal(self, station):
+        return station == 0 or station == self.n_stations - 1
+
+    def dwell(self, station, time):
+        if self.terminal(station) or self.dwell_quantiles is None:
+            return self.base_dwell[station]
+        median = self.dwell_quantiles.quantile(self.quantile_rows[station], int(time // 60), 0.5)
+        return max(float(median), self.min_dwell)
+
+
+class SampledDay(PlannedDay):
+    """PlannedDay with random dwells and a boost rule for late trains.
+
+    Dwells are drawn from the DwellQuantileTable when one is given, else the timetable
+    dwell times a lognormal factor; either way at least min_dwell. By default trains
+    reverse in the terminal platform after that dwell, like f5.py and fleet_sim, instead
+    of adding a siding turnaround. A train more than boost_threshold s behind its planned
+    departure runs the next section on the optimized (boost) profile.
+    """
+
+    def __init__(self, stations, rng, planned, dwell_quantiles=None, dwell_noise=0.25,
+                 boost_threshold=60.0, turnaround=0.0, min_dwell=MIN_DWELL, **kwargs):
+        super().__init__(stations, dwell_quantiles, min_dwell, turnaround, **kwargs)
+        self.rng = rng
+        self.planned = planned
+        self.dwell_noise = dwell_noise
+        self.boost_threshold = boost_threshold
+        self.boost_times = {d: get_segment_table(stations).run_times[(d, "optimized")].tolist() for d in (1, -1)}
+        self.boosts = 0
+
+    def dwell(self, station, time):
+        if self.terminal(station):
+            return self.base_dwell[station]
+        if self.dwell_quantiles is None:
+            dwell = self.base_dwell[station] * self.rng.lognormal(0.0, self.dwell_noise)
+        else:
+            dwell = float(self.dwell_quantiles.sample(self.quantile_rows[station], int(time // 60), self.rng))
+        return max(dwell, self.min_dwell)
+
+    def run_time(self, t, section, direction):
+        stop = len(self.trains[t]["departures"]) - 1
+        if self.now - self.planned[t][stop] > self.boost_threshold:
+            self.boosts += 1
+            return self.boost_times[direction][section]
+        return self.run_times[direction][section]
+
+
+def add_trains(engine, stations, trains, legs=2):
+    for train_id, start, direction, start_time in trains:
+        engine.add_train(train_id, to_seconds(start_time), start % len(stations), direction, legs)
+
+
+def planned_day(stations, trains, legs=2, turnaround=0.0, dwell_quantiles=None, min_dwell=MIN_DWELL):
+    """Deterministic run with median dwells: planned departure of every stop of every train"""
+    engine = PlannedDay(stations, dwell_quantiles, min_dwell, turnaround)
+    add_trains(engine, stations, trains, legs)
+    engine.run()
+    return engine
+
+
+def day_metrics(engine, plan):
+    """Terminal lateness per train (s), mean |headway deviation| (s) and boosts of one day"""
+    lateness = np.array([train["arrivals"][-1] - planned["arrivals"][-1]
+                         for train, planned in zip(engine.trains, plan.trains)])
+
+    # Consecutive trains at the same platform, in planned order: deviation of their gap
+    columns = {"station": [], "direction": [], "planned": [], "actual": []}
+    for train, planned in zip(engine.trains, plan.trains):
+        columns["station"] += train["stops"]
+        columns["direction"] += train["directions"]
+        columns["planned"] += planned["departures"]
+        columns["actual"] += train["departures"]
+    stops = pd.DataFrame(columns).sort_values(["station", "direction", "planned"])
+    same = (stops["station"].diff() == 0) & (stops["direction"].diff() == 0)
+    deviation = (stops["actual"].diff() - stops["planned"].diff())[same].abs()
+    return lateness, float(deviation.mean()) if len(deviation) else 0.0, engine.boosts
+
+
+# ----------- Streaming Aggregate -----------
+class DayAggregate:
+    """Histograms and sums over simulated days; merging two aggregates is exact and order-free."""
+
+    def __init__(self, train_ids):
+        self.train_ids = list(train_ids)
+        self.n_days = 0
+        self.lateness_hist = np.zeros((len(self.train_ids), len(LATENESS_BINS) - 1), dtype=np.int64)
+        self.lateness_sum = np.zeros(len(self.train_ids))
+        self.headway_hist = np.zeros(len(HEADWAY_BINS) - 1, dtype=np.int64)
+        self.headway_sum = 0.0
+        self.boost_hist = np.zeros(len(BOOST_BINS) - 1, dtype=np.int64)
+        self.boost_sum = 0
+
+    @staticmethod
+    def _bin(bins, values):
+        """Histogram bin of each value; values outside the range go to the end bins"""
+        return np.clip(np.searchsorted(bins, values, side="right") - 1, 0, len(bins) - 2)
+
+    def add(self, lateness, headway_deviation, boosts):
+        self.n_days += 1
+        self.lateness_hist[np.arange(len(lateness)), self._bin(LATENESS_BINS, lateness)] += 1
+        self.lateness_sum += lateness
+        self.headway_hist[self._bin(HEADWAY_BINS, headway_deviation)] += 1
+        self.headway_sum += headway_deviation
+        self.boost_hist[self._bin(BOOST_BINS, boosts)] += 1
+        self.boost_sum += boosts
+
+    def merge(self, other):
+        self.n_days += other.n_days
+        self.lateness_hist += other.lateness_hist
+        self.lateness_sum += other.lateness_sum
+        self.headway_hist += other.headway_hist
+        self.headway_sum += other.headway_sum
+        self.boost_hist += other.boost_hist
+        self.boost_sum += other.boost_sum
+        return self
+
+    @staticmethod
+    def percentile(hist, bins, q):
+        """Upper edge of the bin holding quantile q of a histogram"""
+        cdf = np.cumsum(hist, axis=-1) / np.maximum(hist.sum(axis=-1, keepdims=True), 1)
+        idx = (cdf < q).sum(axis=-1)
+        return bins[np.minimum(idx + 1, len(bins) - 1)]
+
+    def summary(self, on_time=60.0):
+        """Per-train terminal lateness: mean, P50/P90/P95 and share within `on_time` s"""
+        n = max(self.n_days, 1)
+        within = self.lateness_hist[:, LATENESS_BINS[1:] <= on_time].sum(axis=1) / n
+        return pd.DataFrame({
+            "Train": self.train_ids,
+            "Mean_Late_s": self.lateness_sum / n,
+            "P50_s": self.percentile(self.lateness_hist, LATENESS_BINS, 0.50),
+            "P90_s": self.percentile(self.lateness_hist, LATENESS_BINS, 0.90),
+            "P95_s": self.percentile(self.lateness_hist, LATENESS_BINS, 0.95),
+            "On_Time": within,
+        })
+
+    def headway_summary(self):
+        n = max(self.n_days, 1)
+        return {
+            "days": self.n_days,
+            "mean_headway_deviation_s": self.headway_sum / n,
+            "p95_headway_deviation_s": float(self.percentile(self.headway_hist, HEADWAY_BINS, 0.95)),
+            "mean_boosts_per_day": self.boost_sum / n,
+        }
+
+
+# ----------- Process-Pool Driver -----------
+_config = {}
+
+
+def _init_worker(config):
+    _config.clear()
+    _config.update(config)
+    _config["plan"] = planned_day(config["stations"], config["trains"], config["legs"], config["turnaround"],
+                                  config["dwell_quantiles"], config["min_dwell"])
+
+
+def day_seed(seed, day):
+    """Seed of one day: depends only on (seed, day), not on chunking or worker count"""
+    return np.random.SeedSequence(seed, spawn_key=(day,))
+
+
+def _run_days(days):
+    """Simulate a batch of days in a worker and return their partial aggregate"""
+    stations, trains, plan = _config["stations"], _config["trains"], _config["plan"]
+    planned = [train["departures"] for train in plan.trains]
+    aggregate = DayAggregate([t[0] for t in trains])
+    for day in days:
+        rng = np.random.default_rng(day_seed(_config["seed"], day))
+        engine = SampledDay(stations, rng, planned, _config["dwell_quantiles"], _config["dwell_noise"],
+                            _config["boost_threshold"], _config["turnaround"], _config["min_dwell"])
+        add_trains(engine, stations, trains, _config["legs"])
+        engine.run()
+        aggregate.add(*day_metrics(engine, plan))
+    return aggregate
+
+
+def run_monte_carlo(n_days, stations=GAIMUKH_CADBUARY, trains=F5_TRAINS, seed=DEFAULT_SEED, legs=2,
+                    dwell_quantiles=None, dwell_noise=0.25, boost_threshold=60.0, turnaround=0.0,
+                    min_dwell=MIN_DWELL, max_workers=None, chunk_size=100):
+    """Simulate n_days independent days across a process pool and return their DayAggregate.
+
+    Workers send back one partial aggregate per chunk of days, so memory does not grow
+    with n_days. Day i always uses day_seed(seed, i): results are reproducible and do not
+    depend on max_workers or chunk_size. max_workers=1 runs in this process.
+    """
+    config = {"stations": stations, "trains": trains, "seed": seed, "legs": legs,
+              "dwell_quantiles": dwell_quantiles, "dwell_noise": dwell_noise,
+              "boost_threshold": boost_threshold, "turnaround": turnaround, "min_dwell": min_dwell}
+    chunks = [range(start, min(start + chunk_size, n_days)) for start in range(0, n_days, chunk_size)]
+    aggregate = DayAggregate([t[0] for t in trains])
+    if max_workers == 1:
+        _init_worker(config)
+        for chunk in chunks:
+            aggregate.merge(_run_days(chunk))
+        return aggregate
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(config,)) as pool:
+        for partial in pool.map(_run_days, chunks):
+            aggregate.merge(partial)
+    return aggregate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo punctuality of the GAIMUKH - CADBUARY service")
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--ml", action="store_true", help="sample dwells from the trained dwell models")
+    args = parser.parse_args()
+
+    quantiles = None
+    if args.ml:
+        from dwell_lookup import compile_quantile_tables
+        from dwell_registry import get_dwell_models
+        quantiles = compile_quantile_tables(get_dwell_models([s[0] for s in GAIMUKH_CADBUARY]))
+
+    start = time.perf_counter()
+    result = run_monte_carlo(args.days, seed=args.seed, dwell_quantiles=quantiles, max_workers=args.workers)
+    print(result.summary().to_string(index=False))
+    print(result.headway_summary())
+    print(f"{result.n_days} days in {time.perf_counter() - start:.1f} s")
@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 
+from sim_time import format_times, to_seconds
+from timetable_stream import CsvSink, write_stream
+
 # Column headers
 columns = [
     'train_id', 'arrival_train_time', 'departuretime', 'train_station', 'train_line',
@@ -54,59 +57,50 @@ start_stations = [
 trains_per_start = 2
 headway = 10 * 60  # 10 minutes between trains from the same start
 
-all_data = []
-train_counter = 1
+def journey_rows(train_id, seq, start_time):
+    """Rows of one journey over seq from start_time (s); returns them and the last departure.
+
+    Times are summed as integer seconds and formatted once for the whole journey.
+    """
+    run = np.array([s[4] for s in seq])
+    legs = run + np.array([s[5] for s in seq])
+    departure = start_time + np.cumsum(legs)
+    arrival = departure - legs
+    rows = []
+    for s, arr, arr_run in zip(seq, format_times(arrival), format_times(arrival + run)):
+        if s[3] is not None:
+            topspeed = (float(s[3]) / float(s[4])) * 3.6
+        else:
+            topspeed = None
+        rows.append([
+            train_id, arr, arr_run,
+            s[0], s[1], s[2],
+            s[3], s[4], s[5], s[6],
+            round(topspeed, 2) if topspeed is not None else ''
+        ])
+    return rows, int(departure[-1])
 
-for start_station in start_stations:
-    start_idx = next(i for i, s in enumerate(stations) if s[0].strip() == start_station.strip())
-    for n in range(trains_per_start):
-        train_id = f"t{train_counter:03d}"
-        train_counter += 1
-        # Forward journey
-        start_time = datetime.strptime('04:57', '%H:%M') + timedelta(seconds=n * headway)
-        for idx, s in enumerate(stations[start_idx:]):
-            if idx == 0:
-                arrival = start_time
-            else:
-                arrival = departure
-            departure = arrival + timedelta(seconds=s[4] + s[5])
-            if s[3] is not None:
-                topspeed = (float(s[3]) / float(s[4])) * 3.6
-            else:
-                topspeed = None
-            all_data.append([
-                train_id,
-                arrival.strftime('%H:%M'),
-                (arrival + timedelta(seconds=s[4])).strftime('%H:%M:%S'),
-                s[0], s[1], s[2],
-                s[3], s[4], s[5], s[6],
-                round(topspeed, 2) if topspeed is not None else ''
-            ])
-        # Return journey
-        turnaround_time = 15 * 60  # 15 minutes at end before return
-        last_arrival = departure
-        return_id = f"{train_id}_R"
-        for idx, s in enumerate(reversed(stations[:start_idx+1])):
-            if idx == 0:
-                arrival = last_arrival + timedelta(seconds=turnaround_time)
-            else:
-                arrival = departure
-            departure = arrival + timedelta(seconds=s[4] + s[5])
-            if s[3] is not None:
-                topspeed = (float(s[3]) / float(s[4])) * 3.6
-            else:
-                topspeed = None
-            all_data.append([
-                return_id,
-                arrival.strftime('%H:%M'),
-                (arrival + timedelta(seconds=s[4])).strftime('%H:%M:%S'),
-                s[0], s[1], s[2],
-                s[3], s[4], s[5], s[6],
-                round(topspeed, 2) if topspeed is not None else ''
-            ])
+def train_chunks():
+    """Yield the rows of one train (forward + return journey) at a time"""
+    train_counter = 1
+    turnaround_time = 15 * 60  # 15 minutes at end before return
+    for start_station in start_stations:
+        start_idx = next(i for i, s in enumerate(stations) if s[0].strip() == start_station.strip())
+        for n in range(trains_per_start):
+            train_id = f"t{train_counter:03d}"
+            train_counter += 1
+            # Forward journey
+            start_time = to_seconds('04:57') + n * headway
+            rows, last_departure = journey_rows(train_id, stations[start_idx:], start_time)
+            # Return journey
+            return_rows, _ = journey_rows(f"{train_id}_R", list(reversed(stations[:start_idx+1])),
+                                          last_departure + turnaround_time)
+            yield rows + return_rows
 
-df = pd.DataFrame(all_data, columns=columns)
-df.to_csv('train_schedule_8_custom.csv', index=False)
+# Each train is written as soon as it is generated; only the plots below read the whole file
+with CsvSink('train_schedule_8_custom.csv', columns) as sink:
+    write_stream(train_chunks(), sink)
+df = pd.read_csv('train_schedule_8_custom.csv', keep_default_na=False)
 # After your DataFrame is created
 import matplotlib.pyplot as plt
 
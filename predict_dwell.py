@@ -0,0 +1,110 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dwell_lookup import compile_dwell_table
+from dwell_registry import DEFAULT_SEED, MODEL_DIR, PEAK_HOURS, STUDIES, get_dwell_models, get_study_model
+
+
+# ----------- Batch Dwell Prediction -----------
+def parse_minutes(times):
+    """Vectorized HH:MM[:SS] -> minutes since midnight (-1 where the format is invalid)"""
+    parts = pd.Series(times, dtype=str).str.strip().str.extract(r"^(\d{1,2}):(\d{2})(?::\d{2})?$")
+    hour = pd.to_numeric(parts[0]).to_numpy(dtype=float)
+    minute = pd.to_numeric(parts[1]).to_numpy(dtype=float)
+    valid = (hour <= 23) & (minute <= 59)
+    return np.where(valid, np.nan_to_num(hour) * 60 + np.nan_to_num(minute), -1).astype(np.int64)
+
+
+def predict_chunks(chunks, default_station, peak_hours=PEAK_HOURS, seed=DEFAULT_SEED, model_dir=MODEL_DIR,
+                   study=None):
+    """Yield DataFrames of Time, Station, Predicted_Dwell for each input chunk.
+
+    Stations get the registry's line models; with `study`, every line is predicted from
+    that study's model and may only name the study's station. Unknown stations raise KeyError.
+    """
+    table = None
+    if study is not None:
+        default_station = STUDIES[study][0]
+        table = compile_dwell_table({default_station: get_study_model(study, seed, model_dir)})
+    for chunk in chunks:
+        chunk = chunk[chunk["Time"].astype(str).str.strip() != "Time"]
+        if chunk.empty:
+            # Empty input, or a chunk that held only the header line
+            continue
+        stations = chunk["Station"].fillna(default_station).astype(str).str.strip()
+        stations = stations.where(stations != "", default_station)
+        names = list(dict.fromkeys(stations))
+        if study is not None:
+            unknown = [name for name in names if name != default_station]
+            if unknown:
+                raise KeyError(f"study {study!r} only covers {default_station!r}, got {unknown[0]!r}")
+        elif table is None or any(name not in table.index for name in names):
+            known = [] if table is None else table.stations
+            models = get_dwell_models(list(dict.fromkeys(known + names)), peak_hours, seed, model_dir)
+            table = compile_dwell_table(models)
+        minutes = parse_minutes(chunk["Time"])
+        station_idx = stations.map(table.index).to_numpy(dtype=np.int64)
+        dwell = np.where(minutes >= 0, table.lookup(station_idx, np.maximum(minutes, 0)), np.nan)
+        yield pd.DataFrame({
+            "Time": chunk["Time"].to_numpy(),
+            "Station": stations.to_numpy(),
+            "Predicted_Dwell": dwell,
+        })
+
+
+def write_csv(results, out):
+    header = True
+    for frame in results:
+        frame.to_csv(out, index=False, header=header)
+        header = False
+
+
+def write_parquet(results, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        sys.exit("Parquet output needs pyarrow (pip install pyarrow)")
+    writer = None
+    for frame in results:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict dwell times for a stream of HH:MM[,STATION] lines")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output .csv or .parquet (default: CSV on stdout)")
+    parser.add_argument("-s", "--station", default="KASARVADVALI", help="station for lines without one")
+    parser.add_argument("--study", choices=sorted(STUDIES),
+                        help="predict from a single-station study's model (its own rush hours and coefficients)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else args.input
+    chunks = pd.read_csv(source, header=None, names=["Time", "Station"], dtype=str,
+                         skip_blank_lines=True, chunksize=args.chunk_size)
+    results = predict_chunks(chunks, args.station, seed=args.seed, study=args.study)
+
+    try:
+        if args.output.endswith(".parquet"):
+            write_parquet(results, args.output)
+        elif args.output == "-":
+            write_csv(results, sys.stdout)
+        else:
+            with open(args.output, "w", newline="") as out:
+                write_csv(results, out)
+    except KeyError as error:
+        sys.exit(f"predict_dwell: {error.args[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 import csv
-import math
 from datetime import timedelta, datetime
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from segment_table import get_segment_table
 
 class Station:
+    __slots__ = ("station_name", "line_name", "station_type", "distance", "run_time", "dwell_time", "civil_speed")
+
     def __init__(self, name, line, stype, distance, run_time, dwell_time, civil_speed):
         self.station_name = name
         self.line_name = line
@@ -28,38 +30,11 @@ stations = [
     Station("CADBUARY JUNCTION", "LINE4", "METRO_6CAR", 824.707, 180, 180, 45)
 ]
 
-def calculate_run_time(distance, civil_speed):
-    brake_distance = 150.0
-    buffer_distance = 50.0
-    vmax_kmph = 35.0 if distance > 800 else 30.0
-    vmax_kmph = min(vmax_kmph, civil_speed)
-    vmax = vmax_kmph * 1000.0 / 3600.0
-
-    accelerating_distance = distance / 8.0
-    # Prevent division by zero or negative acceleration
-    if accelerating_distance <= 0:
-        accelerating_distance = 1.0
-
-    accel = vmax * vmax / (2.0 * accelerating_distance)
-    if accel <= 0:
-        accel = 0.5  # set a minimum acceleration
-
-    t_accel = vmax / accel
-    t_decel = math.sqrt(2 * (brake_distance + buffer_distance) / accel)
-    d_cruise = distance - accelerating_distance - brake_distance
-    t_cruise = d_cruise / vmax if d_cruise > 0 else 0
-
-    if d_cruise < 0:
-        d_half = (distance - brake_distance) if (distance - brake_distance) > 0 else (distance / 2.0)
-        if accel > 0 and d_half > 0:
-            v_peak = math.sqrt(2 * accel * d_half)
-            t_accel = v_peak / accel
-            t_decel = math.sqrt(2 * brake_distance / accel)
-        else:
-            t_accel = t_decel = 0
-        t_cruise = 0
-
-    return t_accel + t_cruise + t_decel
+# Segment table over the same stations; a segment runs at the lower civil speed of its two ends
+segments = get_segment_table([
+    (s.station_name, s.distance, s.dwell_time, min(prev.civil_speed, s.civil_speed))
+    for prev, s in zip([stations[0]] + stations[:-1], stations)
+])
 
 def safest_headway(avg_speed, distance):
     buffer_distance = 50.0
@@ -80,8 +55,7 @@ def main():
         writer.writerow(["From", "To", "Distance(m)", "RunTime(s)", "DwellTime(s)", "TotalSectionTime(s)", "AverageSpeed(km/h)", "SafeHeadway(s)"])
         for i in range(len(stations) - 1):
             distance = stations[i+1].distance
-            civil_speed = min(stations[i].civil_speed, stations[i+1].civil_speed)
-            runtime = calculate_run_time(distance, civil_speed)
+            runtime = segments.run_time(i, 1)
             dwell_time = stations[0].dwell_time if i == 0 else stations[i+1].dwell_time
             section_time = runtime + dwell_time
             avg_speed = (distance / runtime) * 3.6 if runtime > 0 else 0
@@ -127,10 +101,7 @@ def generate_timetable():
         writer.writerow([stations[0].station_name, arrival, departure])
 
         for i in range(1, len(stations)):
-            # Use section distance (difference between consecutive stations)
-            distance = stations[i].distance - stations[i-1].distance
-            civil_speed = min(stations[i-1].civil_speed, stations[i].civil_speed)
-            runtime = calculate_run_time(distance, civil_speed)
+            runtime = segments.run_time(i - 1, 1)
 
             # Arrival time at this station
             current_time_sec += int(runtime)
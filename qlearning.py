@@ -0,0 +1,72 @@
+import numpy as np
+
+# Actions on the (m, c) grid: [↑m, ↓m, ↑c, ↓c]
+ACTION_DM = np.array([1, -1, 0, 0])
+ACTION_DC = np.array([0, 0, 1, -1])
+
+
+# ----------- Reward Surface -----------
+def reward_surface(X, y_true, m_range, c_range):
+    """-MSE of y = m*X + c for every grid point, shape (len(m_range), len(c_range))"""
+    X = np.asarray(X, dtype=float)
+    y_true = np.asarray(y_true, dtype=float)
+    n = len(X)
+    # Expand sum((y - mX - c)^2) so the grid costs O(n_m * n_c), not O(n_m * n_c * n)
+    sx, sy, sxx, sxy, syy = X.sum(), y_true.sum(), X @ X, X @ y_true, y_true @ y_true
+    m = np.asarray(m_range)[:, None]
+    c = np.asarray(c_range)[None, :]
+    sse = syy - 2 * m * sxy - 2 * c * sy + m * m * sxx + 2 * m * c * sx + n * c * c
+    return -sse / n
+
+
+# ----------- Batched Q-Learning -----------
+def q_learning_fit(X, y_true, m_range, c_range, episodes=10_000, n_envs=1024,
+                   alpha=0.1, gamma=0.9, epsilon=0.3, stop_reward=-5.0, max_steps=200, seed=None):
+    """Q-learning over the (m, c) grid with n_envs episodes stepping together.
+
+    Each environment starts at a random grid point and ends when its reward reaches
+    stop_reward or after max_steps, then restarts until `episodes` have finished.
+    Returns (Q, R): the dense Q array (n_m, n_c, 4) and the reward surface.
+    """
+    rng = np.random.default_rng(seed)
+    R = reward_surface(X, y_true, m_range, c_range)
+    n_m, n_c = R.shape
+    Q = np.zeros((n_m, n_c, 4))
+
+    m_idx = rng.integers(0, n_m, n_envs)
+    c_idx = rng.integers(0, n_c, n_envs)
+    steps = np.zeros(n_envs, dtype=np.int64)
+    finished = 0
+    envs = np.arange(n_envs)
+
+    while finished < episodes:
+        explore = rng.random(n_envs) < epsilon
+        action = np.where(explore, rng.integers(0, 4, n_envs), Q[m_idx, c_idx].argmax(axis=1))
+
+        # Moves past the grid edge leave the state unchanged, as in the scalar version
+        new_m = np.clip(m_idx + ACTION_DM[action], 0, n_m - 1)
+        new_c = np.clip(c_idx + ACTION_DC[action], 0, n_c - 1)
+        reward = R[new_m, new_c]
+
+        td = reward + gamma * Q[new_m, new_c].max(axis=1) - Q[m_idx, c_idx, action]
+        # add.at so environments hitting the same (state, action) all contribute
+        np.add.at(Q, (m_idx, c_idx, action), alpha * td)
+
+        m_idx, c_idx = new_m, new_c
+        steps += 1
+        done = (reward >= stop_reward) | (steps >= max_steps)
+        n_done = int(done.sum())
+        if n_done:
+            finished += n_done
+            restart = envs[done]
+            m_idx[restart] = rng.integers(0, n_m, n_done)
+            c_idx[restart] = rng.integers(0, n_c, n_done)
+            steps[restart] = 0
+
+    return Q, R
+
+
+def best_parameters(Q, m_range, c_range):
+    """Grid point whose best action value is highest, as in the original dict scan"""
+    best = np.unravel_index(Q.max(axis=2).argmax(), Q.shape[:2])
+    return m_range[best[0]], c_range[best[1]]
@@ -0,0 +1,97 @@
+import numpy as np
+
+# ----------- Speed Modes -----------
+# normal    : 35 km/h above 800 m, else 30 km/h (calculate_run_time in mltrainedlogic.py)
+# optimized : 38 km/h above 800 m, else 33 km/h (optimized=True, f4.py, f5.py)
+# banded    : distance-banded boost from f3.py
+SPEED_MODES = {"normal": 0, "optimized": 1, "banded": 2}
+
+BRAKE_DISTANCE = 150.0
+BUFFER_DISTANCE = 50.0
+
+
+def mode_codes(modes, shape):
+    """Turn a mode name (or array of names / codes) into an int8 code array of the given shape"""
+    if isinstance(modes, str):
+        return np.full(shape, SPEED_MODES[modes], dtype=np.int8)
+    modes = np.asarray(modes)
+    if modes.dtype.kind in "US" or modes.dtype == object:
+        lookup = np.vectorize(SPEED_MODES.__getitem__, otypes=[np.int8])
+        modes = lookup(modes)
+    return np.broadcast_to(modes.astype(np.int8), shape)
+
+
+def vmax_kmph_batch(distances, codes):
+    """Target top speed (km/h) per segment before the civil speed limit is applied"""
+    normal = np.where(distances > 800, 35.0, 30.0)
+    optimized = np.where(distances > 800, 38.0, 33.0)
+    banded = np.full(distances.shape, 30.0)
+    banded[(distances >= 1100) & (distances < 1200)] = 33.0
+    banded[distances >= 1250] = 35.0
+    return np.choose(codes, [normal, optimized, banded])
+
+
+# ----------- Batch Run Time Calculation -----------
+def calculate_run_time_batch(distances, civil_speeds, modes="normal",
+                             brake_distance=BRAKE_DISTANCE, buffer_distance=BUFFER_DISTANCE):
+    """Vectorized calculate_run_time over arrays of segments.
+
+    Returns a dict of arrays: run_time, t_accel, t_cruise, t_decel (seconds)
+    and v_peak (m/s). Zero-length segments get a run time of 0, as in f3.py.
+    """
+    distances = np.asarray(distances, dtype=float)
+    shape = distances.shape
+    civil_speeds = np.broadcast_to(np.asarray(civil_speeds, dtype=float), shape)
+    codes = mode_codes(modes, shape)
+
+    vmax_kmph = np.minimum(vmax_kmph_batch(distances, codes), civil_speeds)
+    vmax = vmax_kmph * 1000 / 3600
+
+    moving = distances > 0
+    d = np.where(moving, distances, 1.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accelerating_distance = d / 8.0
+        accel = vmax ** 2 / (2 * accelerating_distance)
+        d_cruise = d - accelerating_distance - brake_distance
+        short = d_cruise < 0
+
+        # Enough room to reach vmax: accel / cruise / brake into the buffer
+        t_accel = vmax / accel
+        t_cruise = np.where(d_cruise > 0, d_cruise / vmax, 0.0)
+        t_decel = np.sqrt(2 * (brake_distance + buffer_distance) / accel)
+        v_peak = vmax
+
+        # Too short to reach vmax: peak at d_half, then brake
+        d_half = np.maximum(d - brake_distance, d / 2.0)
+        v_short = np.sqrt(2 * accel * d_half)
+        t_accel = np.where(short, v_short / accel, t_accel)
+        t_cruise = np.where(short, 0.0, t_cruise)
+        t_decel = np.where(short, np.sqrt(2 * brake_distance / accel), t_decel)
+        v_peak = np.where(short, v_short, v_peak)
+
+    t_accel = np.where(moving, t_accel, 0.0)
+    t_cruise = np.where(moving, t_cruise, 0.0)
+    t_decel = np.where(moving, t_decel, 0.0)
+    v_peak = np.where(moving, v_peak, 0.0)
+
+    return {
+        "run_time": t_accel + t_cruise + t_decel,
+        "t_accel": t_accel,
+        "t_cruise": t_cruise,
+        "t_decel": t_decel,
+        "v_peak": v_peak,
+    }
+
+
+def calculate_run_time(distance, civil_speed, optimized=False):
+    """Scalar wrapper with the same signature as mltrainedlogic.calculate_run_time"""
+    mode = "optimized" if optimized else "normal"
+    return float(calculate_run_time_batch([distance], [civil_speed], mode)["run_time"][0])
+
+
+def line_run_times(stations, modes="normal"):
+    """Run time of every segment of a line given (name, distance, dwell, civil_speed) tuples"""
+    distances = np.array([s[1] for s in stations[1:]], dtype=float)
+    civil_speeds = np.array([s[3] for s in stations[1:]], dtype=float)
+    return calculate_run_time_batch(distances, civil_speeds, modes)
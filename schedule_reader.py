@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from sim_time import MISSING, parse_times
+
+DAY = 24 * 3600
+
+# Column names used for times, trains and other labels across the generated schedules
+# (train_schedule_*.csv, day_2.csv, timetable_5to6.csv, metro_train_schedule.csv)
+TIME_COLUMNS = ("arrival_time", "departure_time", "arrival_train_time", "departuretime", "Arrival", "Departure")
+TRAIN_COLUMNS = ("train_id", "Train")
+LABEL_COLUMNS = TRAIN_COLUMNS + ("station", "Station", "train_station", "train_line", "train_type", "direction")
+
+
+# ----------- Midnight Rollover -----------
+def unwrap_midnight(times, groups=None):
+    """Add whole days where a trip's clock jumps back past midnight.
+
+    times is (n_rows, n_columns) seconds read in row order (arrival before departure);
+    MISSING entries are skipped. A drop of more than 12 h from the previous time of the
+    same group (train) means the trip crossed midnight. Returns int32 seconds.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    n_rows, n_cols = times.shape
+    flat = times.ravel()
+    valid = flat != MISSING
+    if groups is None:
+        groups = np.zeros(n_rows, dtype=np.int64)
+    keys = np.repeat(np.asarray(groups), n_cols)
+
+    clock = pd.Series(np.where(valid, flat, np.nan))
+    previous = clock.groupby(keys).ffill().groupby(keys).shift(1)
+    crossed = (clock < previous - DAY // 2).astype(np.int64)
+    days = crossed.groupby(keys).cumsum().to_numpy()
+
+    unwrapped = np.where(valid, flat + days * DAY, MISSING)
+    return unwrapped.reshape(n_rows, n_cols).astype(np.int32)
+
+
+# ----------- Schedule Reader -----------
+def read_schedule(path, rollover=True):
+    """Read a schedule CSV with typed columns.
+
+    Time columns become int32 seconds since midnight of the service day (MISSING for
+    '--' or empty; 'HH:MM' and 'HH:MM:SS' may be mixed), trains and stations become
+    categoricals. With rollover, times after midnight keep counting past 24:00.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    time_columns = [c for c in header if c in TIME_COLUMNS]
+    dtype = {c: str for c in time_columns}
+    dtype.update({c: "category" for c in header if c in LABEL_COLUMNS})
+    frame = pd.read_csv(path, dtype=dtype)
+    if not time_columns:
+        return frame
+
+    times = np.column_stack([parse_times(frame[c].to_numpy()) for c in time_columns])
+    if rollover:
+        train = next((c for c in header if c in TRAIN_COLUMNS), None)
+        groups = frame[train].cat.codes.to_numpy() if train is not None else None
+        times = unwrap_midnight(times, groups)
+    for k, column in enumerate(time_columns):
+        frame[column] = times[:, k]
+    return frame
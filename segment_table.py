@@ -0,0 +1,67 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from runtime_kernel import SPEED_MODES, BRAKE_DISTANCE, BUFFER_DISTANCE, calculate_run_time_batch
+
+Segment = namedtuple("Segment", ["run_time", "avg_speed", "safe_headway"])
+
+
+# ----------- Segment Table -----------
+class SegmentTable:
+    """Run time, average speed and safe headway for every segment, direction and speed profile of a line"""
+
+    def __init__(self, stations):
+        self.names = [s[0] for s in stations]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        distances = np.array([s[1] for s in stations[1:]], dtype=float)
+        civil_speeds = np.array([s[3] for s in stations], dtype=float)
+
+        # Arrays indexed by segment k (between station k and k+1). As in the simulators,
+        # the civil speed of the station being approached applies to the segment.
+        self.run_times = {}
+        self.avg_speeds = {}
+        self.safe_headways = {}
+        for profile in SPEED_MODES:
+            for direction in (1, -1):
+                limits = civil_speeds[1:] if direction == 1 else civil_speeds[:-1]
+                result = calculate_run_time_batch(distances, limits, profile)
+                run_time = result["run_time"]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    avg_speed = np.where(run_time > 0, distances / run_time * 3.6, 0.0)
+                    safe_headway = np.where(result["v_peak"] > 0,
+                                            (BRAKE_DISTANCE + BUFFER_DISTANCE) / result["v_peak"], 0.0)
+                self.run_times[(direction, profile)] = run_time
+                self.avg_speeds[(direction, profile)] = avg_speed
+                self.safe_headways[(direction, profile)] = safe_headway
+
+        self.rows = {}
+        for (direction, profile), run_time in self.run_times.items():
+            avg_speed = self.avg_speeds[(direction, profile)]
+            safe_headway = self.safe_headways[(direction, profile)]
+            for k in range(len(distances)):
+                a, b = (k, k + 1) if direction == 1 else (k + 1, k)
+                self.rows[(self.names[a], self.names[b], direction, profile)] = Segment(
+                    float(run_time[k]), float(avg_speed[k]), float(safe_headway[k])
+                )
+
+    def __getitem__(self, key):
+        """Look up a Segment by (from_station, to_station, direction, profile)"""
+        return self.rows[key]
+
+    def run_time(self, idx, direction, profile="normal"):
+        """Run time leaving station index idx in the given direction (1 or -1)"""
+        k = idx if direction == 1 else idx - 1
+        return self.run_times[(direction, profile)][k]
+
+
+@lru_cache(maxsize=16)
+def _build_table(fingerprint):
+    return SegmentTable([(name, distance, None, civil_speed) for name, distance, civil_speed in fingerprint])
+
+
+def get_segment_table(stations):
+    """Cached SegmentTable for a line; rebuilt whenever a distance or civil speed changes"""
+    fingerprint = tuple((s[0], float(s[1]), float(s[3])) for s in stations)
+    return _build_table(fingerprint)
@@ -86,21 +86,7 @@ plt.legend()
 plt.tight_layout()
 plt.show()
 
-# --- Interactive Input for Prediction using Random Forest ---
-while True:
-    user_input = input("Enter time in HH:MM format (or 'exit' to quit): ").strip()
-    if user_input.lower() == 'exit':
-        break
-    try:
-        # Convert HH:MM to minutes since midnight
-        hour, minute = map(int, user_input.split(":"))
-        if hour < 0 or hour > 23 or minute < 0 or minute > 59:
-            raise ValueError
-        minutes_input = hour * 60 + minute
-
-        # Predict dwell time
-        predicted_dwell = rf.predict([[minutes_input]])[0]
-        print(f"Predicted dwell time at {user_input} is: {predicted_dwell:.2f} seconds")
-    except:
-        print("Invalid input. Please enter time in HH:MM format.")
-
+# --- Batch Prediction ---
+# Predictions for whole days of stops come from predict_dwell.py, which loads the
+# persisted model of this script's process (dwell_registry.STUDIES) instead of retraining, e.g.
+#   python predict_dwell.py times.txt --study shreyascinema --output dwell.csv
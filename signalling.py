@@ -0,0 +1,212 @@
+import numpy as np
+
+from runtime_kernel import BRAKE_DISTANCE, BUFFER_DISTANCE
+from speed_profile import segment_profiles
+
+SIGNALLING_MODES = ("fixed", "moving")
+
+
+# ----------- Block Signalling -----------
+class Signalling:
+    """Separation rules between trains following each other through a section.
+
+    fixed  : each section is cut into blocks of at most block_length m (500 by default). A
+             train may only reach a block once the train ahead has cleared it plus an
+             overlap of brake_distance + buffer_distance.
+    moving : the follower must stay brake_distance + buffer_distance behind the leader
+             at every point of the section. Trains that have to stop do so at points
+             every block_length m (50 by default), the blocks of this mode.
+
+    Trains on a section follow the same speed profile, so the binding gap behind a train
+    running unimpeded depends only on the section: it is precomputed, and earliest_entry()
+    is O(1) then. A train stopped in a section, held short of its platform (hold()) or at
+    a block boundary (stop()), keeps the blocks behind it occupied until it restarts; the
+    trains behind it are planned block by block (next_move()) and stop at the entry of
+    the first block they may not reach. Restarts follow the profile from rest at that
+    block. Block positions are measured from the departure end of the section.
+    """
+
+    def __init__(self, stations, mode="fixed", profile="normal", block_length=None,
+                 brake_distance=BRAKE_DISTANCE, buffer_distance=BUFFER_DISTANCE, points=200):
+        if mode not in SIGNALLING_MODES:
+            raise ValueError(f"mode must be one of {SIGNALLING_MODES}, got {mode!r}")
+        if block_length is None:
+            block_length = 500.0 if mode == "fixed" else 50.0
+        self.mode = mode
+        self.separation = brake_distance + buffer_distance
+        distances = np.array([s[1] for s in stations[1:]], dtype=float)
+        civil_speeds = np.array([s[3] for s in stations], dtype=float)
+        n_sections = len(distances)
+
+        # Blocks of every section: equal lengths, at least one per section
+        n_blocks = np.maximum(np.ceil(distances / block_length), 1).astype(np.int64)
+        self.first_block = np.concatenate([[0], np.cumsum(n_blocks)])
+        self.block_section = np.repeat(np.arange(n_sections), n_blocks)
+        within = np.arange(self.first_block[-1]) - self.first_block[self.block_section]
+        length = distances[self.block_section] / n_blocks[self.block_section]
+        self.block_start = within * length
+        self.block_end = self.block_start + length
+        # Position the train ahead must have passed before a follower may reach the block
+        if mode == "fixed":
+            self.clear_position = self.block_end + self.separation
+        else:
+            self.clear_position = self.block_start + self.separation
+        # Where a stopped train stands: a block entry, or the end of the section
+        self.stop_position = [np.append(self.block_start[self._blocks(k)], distances[k]) for k in range(n_sections)]
+
+        self.headway = {}
+        self.reach_from = {}
+        self.clear_from = {}
+        self.run_from = {}
+        for direction in (1, -1):
+            limits = civil_speeds[1:] if direction == 1 else civil_speeds[:-1]
+            # Profile from rest at every block entry; the one of the first block of a
+            # section is its profile from the platform
+            rest = segment_profiles(distances[self.block_section] - self.block_start, limits[self.block_section],
+                                    profile, points, brake_distance, buffer_distance)
+            times = rest["time"]
+            positions = rest["position"]
+
+            headway = np.zeros(n_sections)
+            reach_from, clear_from, run_from = [], [], []
+            for k in range(n_sections):
+                blocks = self._blocks(k)
+                start = self.block_start[blocks]
+                clear = self.clear_position[blocks]
+                n = len(start)
+                # (origin block, block): time from rest at the origin to the block entry,
+                # and to the clear position of the block; -inf for the blocks behind
+                reach = np.full((n, n), -np.inf)
+                cleared = np.full((n, n), -np.inf)
+                for origin in range(n):
+                    row = self.first_block[k] + origin
+
+                    def from_origin(x):
+                        return np.interp(np.minimum(x, distances[k]) - start[origin], positions[row], times[row])
+
+                    ahead = start >= start[origin]
+                    reach[origin, ahead] = from_origin(start[ahead])
+                    ahead = clear > start[origin]
+                    cleared[origin, ahead] = from_origin(clear[ahead])
+                reach_from.append(reach)
+                clear_from.append(cleared)
+                run_from.append(rest["run_time"][blocks].tolist())
+
+                gaps = cleared[0] - reach[0]
+                if mode == "moving":
+                    # Every point of the profile, not only the stop points
+                    row = self.first_block[k]
+                    gaps = np.append(gaps, np.interp(np.minimum(positions[row] + self.separation, distances[k]),
+                                                     positions[row], times[row]) - times[row])
+                headway[k] = gaps.max() if distances[k] > 0 else 0.0
+            self.headway[direction] = headway.tolist()
+            self.reach_from[direction] = reach_from
+            self.clear_from[direction] = clear_from
+            self.run_from[direction] = run_from
+
+        self.last_entry = {d: [-np.inf] * n_sections for d in (1, -1)}
+        # Trains in every section, leader first, and the run of each: the block it last
+        # started from (None while stopped there), its arrival time and whether it has
+        # run unimpeded since it entered
+        self.inside = {d: [[] for _ in range(n_sections)] for d in (1, -1)}
+        self.runs = {}
+
+    def _blocks(self, section):
+        return slice(self.first_block[section], self.first_block[section + 1])
+
+    def _clear_times(self, run, blocks=slice(None)):
+        """Time a train clears blocks of its section (local indices); inf while it is stopped short of them"""
+        section = run["section"]
+        if run["start"] is None:
+            clear = self.clear_position[self._blocks(section)][blocks]
+            return np.where(clear > self.stop_position[section][run["origin"]], np.inf, -np.inf)
+        return run["start"] + self.clear_from[run["direction"]][section][run["origin"], blocks]
+
+    def _leader(self, train):
+        run = self.runs[train]
+        inside = self.inside[run["direction"]][run["section"]]
+        i = inside.index(train)
+        return self.runs[inside[i - 1]] if i else None
+
+    def earliest_entry(self, section, direction):
+        """Earliest time a train may enter section (segment index) behind the last one that did.
+
+        np.inf while that train is stopped on the first block: the time is only known
+        once it restarts.
+        """
+        entry = self.last_entry[direction][section] + self.headway[direction][section]
+        inside = self.inside[direction][section]
+        if inside and not self.runs[inside[-1]]["clean"]:
+            entry = max(entry, float(self._clear_times(self.runs[inside[-1]], 0)))
+        return entry
+
+    def enter(self, train, section, direction, time, arrival):
+        """Record train entering section at time, due on the platform at arrival if unimpeded"""
+        self.last_entry[direction][section] = time
+        self.inside[direction][section].append(train)
+        self.runs[train] = {"section": section, "direction": direction, "origin": 0, "start": time,
+                            "arrival": arrival, "clean": True, "stop": None}
+
+    def next_move(self, train, time):
+        """(time, block) of the next move of a train in a section, planned at time.
+
+        A moving train is either due on its platform, (arrival, None), or has to stop at
+        the entry of the first block the train ahead will not have cleared when it gets
+        there. A stopped train restarts once the train ahead clears the block it stopped
+        at: -inf if it already has, np.inf while that is not known yet.
+        """
+        run = self.runs[train]
+        leader = self._leader(train)
+        origin = run["origin"]
+        if run["start"] is None:
+            if leader is None:
+                return -np.inf, origin
+            return float(self._clear_times(leader, origin)), origin
+        if leader is None or leader["clean"]:
+            # Entered a headway behind a train that runs unimpeded: never held
+            return run["arrival"], None
+        reach = run["start"] + self.reach_from[run["direction"]][run["section"]][origin]
+        blocked = np.flatnonzero((self._clear_times(leader) > reach + 1e-6) & (reach >= time - 1e-6))
+        if not blocked.size:
+            return run["arrival"], None
+        run["stop"] = blocked[0]
+        return float(reach[blocked[0]]), run["stop"]
+
+    def stopped(self, train):
+        return self.runs[train]["start"] is None
+
+    def follower(self, train):
+        """The train behind train in its section, or None"""
+        run = self.runs[train]
+        inside = self.inside[run["direction"]][run["section"]]
+        i = inside.index(train) + 1
+        return inside[i] if i < len(inside) else None
+
+    def stop(self, train):
+        """Record train stopped at the entry of the block its last next_move() planned"""
+        run = self.runs[train]
+        run.update(origin=run["stop"], start=None, clean=False)
+
+    def hold(self, train):
+        """Record train stopped at the end of its section, waiting for its platform"""
+        run = self.runs[train]
+        run.update(origin=len(self.stop_position[run["section"]]) - 1, start=None, clean=False)
+
+    def resume(self, train, time):
+        """Record train restarting at time from the block entry it stopped at"""
+        run = self.runs[train]
+        run["start"] = time
+        run["arrival"] = time + self.run_from[run["direction"]][run["section"]][run["origin"]]
+
+    def leave(self, train):
+        """Record train leaving its section onto its platform"""
+        run = self.runs.pop(train)
+        self.inside[run["direction"]][run["section"]].remove(train)
+
+    def occupied(self, direction, time):
+        """Boolean per block: not yet cleared (including overlap) at time by a train in its section"""
+        occupied = np.zeros(len(self.block_section), dtype=bool)
+        for section, inside in enumerate(self.inside[direction]):
+            for train in inside:
+                occupied[self._blocks(section)] |= self._clear_times(self.runs[train]) > time
+        return occupied
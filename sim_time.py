@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# ----------- Integer-Seconds Time Core -----------
+# Simulators carry every stop event as int32 seconds since the start of the service day
+# (midnight). Times stay numeric through the simulation and are only turned into
+# strings at export, so no sub-minute detail is lost on the way.
+
+MISSING = -1  # marks "--" / empty times, e.g. the arrival at the origin station
+
+
+def to_seconds(text):
+    """'HH:MM' or 'HH:MM:SS' -> seconds since midnight"""
+    parts = [int(p) for p in text.strip().split(":")]
+    seconds = parts[2] if len(parts) > 2 else 0
+    return parts[0] * 3600 + parts[1] * 60 + seconds
+
+
+def format_times(seconds, with_seconds=True):
+    """Vectorized seconds -> 'HH:MM:SS' (or 'HH:MM') strings; MISSING becomes '--'.
+
+    Hours past midnight keep counting (25:10:00) so trips crossing midnight stay ordered.
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    hours = pd.Series(seconds // 3600).astype(str).str.zfill(2)
+    minutes = pd.Series(seconds // 60 % 60).astype(str).str.zfill(2)
+    text = hours + ":" + minutes
+    if with_seconds:
+        text = text + ":" + pd.Series(seconds % 60).astype(str).str.zfill(2)
+    return np.where(seconds == MISSING, "--", text.to_numpy())
+
+
+def format_time_axis(ax, step=600, with_seconds=False, axis="x"):
+    """Label a matplotlib axis that holds seconds since midnight as HH:MM, a tick every `step` s"""
+    from matplotlib.ticker import FuncFormatter, MultipleLocator
+    target = ax.xaxis if axis == "x" else ax.yaxis
+    target.set_major_locator(MultipleLocator(step))
+    target.set_major_formatter(FuncFormatter(lambda value, _: format_times([round(value)], with_seconds)[0]))
+
+
+def round_seconds(values):
+    """Float clock values -> int32 seconds"""
+    return np.rint(np.asarray(values, dtype=float)).astype(np.int32)
+
+
+def trip_times(start, run_times, dwells):
+    """Arrival and departure of every stop of a trip with fixed dwells, in one cumsum.
+
+    run_times[i] is the run into stop i + 1, dwells[i] the dwell at stop i.
+    The origin has no arrival (MISSING).
+    """
+    run_times = np.asarray(run_times, dtype=float)
+    dwells = np.asarray(dwells, dtype=float)
+    legs = np.empty(len(dwells))
+    legs[0] = dwells[0]
+    legs[1:] = run_times + dwells[1:]
+    departure = start + np.cumsum(legs)
+    arrival = departure - dwells
+    arrival = round_seconds(arrival)
+    arrival[0] = MISSING
+    return arrival, round_seconds(departure)
+
+
+def _parse_irregular(values):
+    """Regex fallback for times that are not zero-padded 'HH:MM' / 'HH:MM:SS'"""
+    # [0-9], not \d: \d also matches non-ASCII digits, which to_numeric cannot read
+    parts = pd.Series(values, dtype=object).astype(str).str.strip().str.extract(r"^([0-9]{1,2}):([0-5][0-9])(?::([0-5][0-9]))?$")
+    parts = parts.apply(pd.to_numeric)
+    seconds = parts[0] * 3600 + parts[1] * 60 + parts[2].fillna(0)
+    return seconds.fillna(MISSING).to_numpy().astype(np.int32)
+
+
+def parse_times(values):
+    """Vectorized 'HH:MM[:SS]' -> int32 seconds; '--', empty, NaN and invalid times become MISSING.
+
+    Zero-padded ASCII strings are decoded straight from their character codes; anything else goes
+    through a regex, so a clean 100k-row column parses in milliseconds.
+    """
+    values = np.asarray(values, dtype=object)
+    missing = pd.isna(values)
+    text = np.where(missing, "", values) if missing.any() else values
+    try:
+        ascii_only = np.ones(len(text), dtype=bool)
+        raw = text.astype("S9")
+    except UnicodeEncodeError:
+        ascii_only = np.array([str(v).isascii() for v in text], dtype=bool)
+        raw = np.where(ascii_only, text, "").astype("S9")
+    codes = raw.view(np.uint8).reshape(len(raw), 9)
+    # A ninth byte means the string is longer than 8 characters: those, and non-ASCII
+    # strings, are left to the regex
+    fits = ascii_only & (codes[:, 8] == 0)
+    chars = codes[:, :8] - np.uint8(ord("0"))  # digits -> 0..9
+    digit = chars < 10
+    colon = np.uint8(ord(":") - ord("0"))
+    # Minutes and seconds run 00-59; hours keep counting past midnight
+    hhmm = fits & digit[:, 0] & digit[:, 1] & (chars[:, 2] == colon) & (chars[:, 3] < 6) & digit[:, 4]
+    has_seconds = hhmm & (chars[:, 5] == colon) & (chars[:, 6] < 6) & digit[:, 7]
+    short = hhmm & (chars[:, 5] == np.uint8(-ord("0") % 256))  # 'HH:MM' padded with NUL
+    c = chars.astype(np.int32)
+    seconds = (c[:, 0] * 10 + c[:, 1]) * 3600 + (c[:, 3] * 10 + c[:, 4]) * 60
+    seconds += np.where(has_seconds, c[:, 6] * 10 + c[:, 7], 0)
+    seconds[~(has_seconds | short)] = MISSING
+
+    irregular = ~(has_seconds | short) & (~fits | ((raw != b"") & (raw != b"--")))
+    if irregular.any():
+        seconds[irregular] = _parse_irregular(values[irregular])
+    return seconds
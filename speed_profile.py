@@ -0,0 +1,80 @@
+import numpy as np
+
+from runtime_kernel import BRAKE_DISTANCE, BUFFER_DISTANCE, calculate_run_time_batch, mode_codes, vmax_kmph_batch
+
+
+# ----------- Closed-Form Speed Profiles -----------
+def segment_profiles(distances, civil_speeds, modes="normal", points=200,
+                     brake_distance=BRAKE_DISTANCE, buffer_distance=BUFFER_DISTANCE):
+    """Accelerate / cruise / brake trajectory of every segment, sampled at `points` positions each.
+
+    Phase boundaries and durations are those of calculate_run_time: the train reaches vmax
+    after distance / 8, starts braking brake_distance before the platform (at the peak
+    point for short segments) and brakes for the kernel's t_decel, which allows for the
+    buffer distance. The braking phase keeps the speed-distance shape of a constant
+    deceleration to a stop at the platform, run on that t_decel, so run_time and the
+    time axis agree with the segment table the simulators use.
+    Returns a dict of (n_segments, points) arrays: position (m into the segment),
+    speed (km/h) and time (s since departure), plus run_time per segment.
+    """
+    D = np.asarray(distances, dtype=float)
+    civil_speeds = np.broadcast_to(np.asarray(civil_speeds, dtype=float), D.shape)
+    codes = mode_codes(modes, D.shape)
+    vmax = np.minimum(vmax_kmph_batch(D, codes), civil_speeds) * 1000 / 3600
+    kernel = calculate_run_time_batch(D, civil_speeds, codes, brake_distance, buffer_distance)
+
+    moving = D > 0
+    Dm = np.where(moving, D, 1.0)
+    accel = vmax ** 2 / (2 * Dm / 8.0)
+    short = Dm - Dm / 8.0 - brake_distance < 0
+    d_half = np.maximum(Dm - brake_distance, Dm / 2.0)
+
+    d_up = np.where(short, d_half, Dm / 8.0)
+    v_top = np.where(short, np.sqrt(2 * accel * d_half), vmax)
+    d_brake = np.where(short, d_half, Dm - brake_distance)
+
+    t_up = kernel["t_accel"]
+    t_brake = t_up + kernel["t_cruise"]
+    t_decel = kernel["t_decel"]
+
+    s = np.linspace(0.0, 1.0, points)[None, :] * Dm[:, None]
+    a = accel[:, None]
+    # Fraction of the braking distance still ahead; speed falls as its square root
+    remaining = np.clip((Dm[:, None] - s) / (Dm - d_brake)[:, None], 0.0, 1.0)
+    in_up = s < d_up[:, None]
+    in_cruise = s < d_brake[:, None]
+
+    speed = np.where(in_up, np.sqrt(2 * a * s),
+                     np.where(in_cruise, v_top[:, None], v_top[:, None] * np.sqrt(remaining)))
+    time = np.where(in_up, np.sqrt(2 * s / a),
+                    np.where(in_cruise, t_up[:, None] + (s - d_up[:, None]) / v_top[:, None],
+                             t_brake[:, None] + t_decel[:, None] * (1.0 - np.sqrt(remaining))))
+
+    mask = moving[:, None]
+    return {
+        "position": np.where(mask, s, 0.0),
+        "speed": np.where(mask, speed * 3.6, 0.0),
+        "time": np.where(mask, time, 0.0),
+        "run_time": kernel["run_time"],
+    }
+
+
+def line_profile(stations, modes="normal", points=200, include_dwell=False):
+    """Speed-distance-time profile of a whole line from (name, distance, dwell, civil_speed) tuples.
+
+    Positions and times are cumulative from the first station, one row per segment.
+    """
+    distances = np.array([s[1] for s in stations[1:]], dtype=float)
+    civil_speeds = np.array([s[3] for s in stations[1:]], dtype=float)
+    profile = segment_profiles(distances, civil_speeds, modes, points)
+
+    start_position = np.concatenate([[0.0], np.cumsum(distances)[:-1]])
+    leg_time = profile["run_time"].copy()
+    if include_dwell:
+        leg_time += np.array([s[2] for s in stations[1:]], dtype=float)
+    start_time = np.concatenate([[0.0], np.cumsum(leg_time)[:-1]])
+
+    profile["segment_position"] = profile["position"]
+    profile["position"] = profile["position"] + start_position[:, None]
+    profile["time"] = profile["time"] + start_time[:, None]
+    return profile
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from sim_time import MISSING, format_times
+
+# ----------- Compact Stop-Event Record -----------
+# One stop event is a 15-byte packed record: interned train and station IDs, direction
+# (+1 / -1), and int32 arrival/departure seconds since midnight. A week of Line 4 service
+# fits in a few MB, against several hundred bytes per event for a dict of strings.
+STOP_EVENT = np.dtype([
+    ("train", np.int32),
+    ("station", np.int16),
+    ("direction", np.int8),
+    ("arrival", np.int32),
+    ("departure", np.int32),
+])
+
+
+class Interner:
+    """Maps names to small consecutive integers and back."""
+
+    __slots__ = ("names", "codes")
+
+    def __init__(self, names=()):
+        self.names = []
+        self.codes = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def decode(self, codes):
+        """Integer codes -> array of names"""
+        return np.array(self.names, dtype=object)[np.asarray(codes)]
+
+
+class StopEventLog:
+    """Growable array of STOP_EVENT records with the interners that decode it.
+
+    Appending a whole trip at once writes straight into a preallocated block that
+    doubles when full, so building a long log costs amortized O(1) per event.
+    """
+
+    def __init__(self, stations=(), capacity=1024):
+        self.stations = Interner(stations)
+        self.trains = Interner()
+        self._events = np.empty(capacity, dtype=STOP_EVENT)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def events(self):
+        """View of the filled part of the log"""
+        return self._events[:self._size]
+
+    def _reserve(self, n):
+        if self._size + n > len(self._events):
+            grown = np.empty(max(2 * len(self._events), self._size + n), dtype=STOP_EVENT)
+            grown[:self._size] = self._events[:self._size]
+            self._events = grown
+
+    def append_trip(self, train, stations, arrivals, departures, direction=1):
+        """Add every stop of one trip; stations may be names or station codes"""
+        stations = np.asarray(stations)
+        if stations.dtype.kind in "OU":
+            stations = np.array([self.stations.intern(s) for s in stations])
+        n = len(stations)
+        self._reserve(n)
+        block = self._events[self._size:self._size + n]
+        block["train"] = self.trains.intern(train)
+        block["station"] = stations
+        block["direction"] = direction
+        block["arrival"] = arrivals
+        block["departure"] = departures
+        self._size += n
+
+    def extend(self, trains, stations, arrivals, departures, directions):
+        """Add many stop events at once; trains and stations are already interned codes"""
+        n = len(trains)
+        self._reserve(n)
+        block = self._events[self._size:self._size + n]
+        block["train"] = trains
+        block["station"] = stations
+        block["direction"] = directions
+        block["arrival"] = arrivals
+        block["departure"] = departures
+        self._size += n
+
+    def to_frame(self, with_seconds=True):
+        """Decoded DataFrame (Train, Station, Arrival, Departure) for export"""
+        events = self.events
+        return pd.DataFrame({
+            "Train": self.trains.decode(events["train"]),
+            "Station": self.stations.decode(events["station"]),
+            "Arrival": format_times(events["arrival"], with_seconds),
+            "Departure": format_times(events["departure"], with_seconds),
+        })
+
+
+def empty_events(n):
+    """Structured array for n stop events, times set to MISSING"""
+    events = np.zeros(n, dtype=STOP_EVENT)
+    events["arrival"] = MISSING
+    events["departure"] = MISSING
+    return events
@@ -0,0 +1,71 @@
+import numpy as np
+
+from segment_table import get_segment_table
+
+
+# ----------- Trip Templates -----------
+def cumulative_offsets(legs):
+    """Offset of every stop from the trip start, given the seconds spent on each leg before the next stop"""
+    legs = np.asarray(legs, dtype=np.int64)
+    offsets = np.zeros(len(legs), dtype=np.int64)
+    offsets[1:] = np.cumsum(legs[:-1])
+    return offsets
+
+
+def line_template(stations, direction=1, profile="normal", origin_dwell=None):
+    """Arrival/departure offsets (s) of one trip over a whole line, from the origin arrival.
+
+    Run times come from the segment table, dwells from the station tuples.
+    Returns a dict with station (index into stations), arrival and departure offsets.
+    """
+    segments = get_segment_table(stations)
+    order = np.arange(len(stations))
+    if direction == -1:
+        order = order[::-1]
+    run = np.rint(segments.run_times[(direction, profile)]).astype(np.int64)
+    if direction == -1:
+        run = run[::-1]
+    dwell = np.array([stations[i][2] for i in order], dtype=np.int64)
+    if origin_dwell is not None:
+        dwell[0] = origin_dwell
+    arrival = np.zeros(len(order), dtype=np.int64)
+    arrival[1:] = np.cumsum(dwell[:-1] + run)
+    return {"station": order, "arrival": arrival, "departure": arrival + dwell}
+
+
+# ----------- Expansion -----------
+def expand_trips(starts, template):
+    """Broadcast one trip template over every trip start time.
+
+    starts is an array of trip start times (s); template maps column name -> per-stop
+    offsets, except "station" which is copied as is. Returns flat columns, one entry
+    per stop event, plus "trip" (index into starts) and "stop" (index within the trip).
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    n_trips = len(starts)
+    n_stops = len(next(iter(template.values())))
+    columns = {
+        "trip": np.repeat(np.arange(n_trips, dtype=np.int32), n_stops),
+        "stop": np.tile(np.arange(n_stops, dtype=np.int32), n_trips),
+    }
+    for name, offsets in template.items():
+        offsets = np.asarray(offsets)
+        if name == "station":
+            columns[name] = np.tile(offsets.astype(np.int32), n_trips)
+        else:
+            columns[name] = (starts[:, None] + offsets[None, :]).astype(np.int32).ravel()
+    return columns
+
+
+def chain_legs(starts, leg_durations, turnaround):
+    """Start time of every leg of every rake for forward -> turnaround -> return -> ... cycles.
+
+    leg_durations lists the origin-to-terminal duration of each leg in order, e.g.
+    [forward, return] * n_cycles. Returns an (n_legs, n_trains) array built with one
+    cumsum, so the cost is linear in the number of legs.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    steps = np.asarray(leg_durations, dtype=np.int64) + turnaround
+    offsets = np.zeros(len(steps), dtype=np.int64)
+    offsets[1:] = np.cumsum(steps[:-1])
+    return starts[None, :] + offsets[:, None]
@@ -0,0 +1,179 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from sim_time import MISSING, format_times, parse_times
+
+SCHEMA_FILE = "schema.json"
+
+
+# ----------- Columnar Timetable Store -----------
+# A timetable is stored as a directory with one uncompressed .npy file per column plus
+# schema.json. Station and train names are categorical (small integer codes + one name
+# table), times are int32 seconds since midnight, speeds and distances float32.
+# np.load(mmap_mode="r") maps every column straight from disk, so a filter over a
+# multi-million-row day only touches the columns it reads. CSV stays for humans.
+
+def _code_dtype(n_categories):
+    return np.int16 if n_categories < 2 ** 15 else np.int32
+
+
+def encode_categories(values):
+    """Strings -> (integer codes, list of names), names in order of first appearance"""
+    codes, names = pd.factorize(pd.Series(values, dtype=object))
+    return codes.astype(_code_dtype(len(names))), [str(n) for n in names]
+
+
+class Timetable:
+    """Columns of one stored timetable (numpy arrays, possibly memory-mapped)."""
+
+    def __init__(self, columns, categories=None, time_columns=()):
+        self.columns = columns
+        self.categories = categories or {}
+        self.time_columns = list(time_columns)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def code(self, column, name):
+        """Integer code of a category name, e.g. code("station", "GAIMUKH")"""
+        return self.categories[column].index(name)
+
+    def decode(self, column):
+        """Category codes of a column -> array of names"""
+        return np.array(self.categories[column], dtype=object)[self.columns[column]]
+
+    def select(self, mask):
+        """New Timetable with the rows where mask is True"""
+        columns = {name: np.asarray(values)[mask] for name, values in self.columns.items()}
+        return Timetable(columns, self.categories, self.time_columns)
+
+    def to_frame(self, decode=True):
+        frame = pd.DataFrame({name: np.asarray(values) for name, values in self.columns.items()})
+        if decode:
+            for column, names in self.categories.items():
+                frame[column] = pd.Categorical.from_codes(frame[column], categories=names)
+        return frame
+
+    def to_csv(self, path, with_seconds=True):
+        """Human-readable export: category names and 'HH:MM:SS' times ('--' when missing)"""
+        frame = self.to_frame()
+        for column in self.time_columns:
+            frame[column] = format_times(frame[column].to_numpy(), with_seconds=with_seconds)
+        frame.to_csv(path, index=False)
+
+
+def from_frame(frame, time_columns=(), category_columns=(), float_columns=()):
+    """Typed Timetable from a (CSV-shaped) DataFrame.
+
+    Time columns may hold 'HH:MM[:SS]' strings or seconds; category columns are
+    factorized; float columns become float32. Other columns are kept as they are.
+    """
+    columns, categories = {}, {}
+    for name in frame.columns:
+        values = frame[name]
+        if name in time_columns:
+            if pd.api.types.is_numeric_dtype(values):
+                columns[name] = values.fillna(MISSING).to_numpy().astype(np.int32)
+            else:
+                columns[name] = parse_times(values)
+        elif name in category_columns:
+            columns[name], categories[name] = encode_categories(values)
+        elif name in float_columns:
+            columns[name] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float32)
+        else:
+            columns[name] = values.to_numpy()
+    return Timetable(columns, categories, time_columns)
+
+
+# ----------- Save / Load -----------
+def save_timetable(path, timetable):
+    """Write every column as <path>/<column>.npy plus schema.json"""
+    os.makedirs(path, exist_ok=True)
+    for name, values in timetable.columns.items():
+        values = np.asarray(values)
+        if values.dtype == object:
+            raise TypeError(f"column {name!r} is not numeric; make it a category column")
+        np.save(os.path.join(path, name + ".npy"), values)
+    schema = {
+        "columns": list(timetable.columns),
+        "categories": timetable.categories,
+        "time_columns": timetable.time_columns,
+    }
+    with open(os.path.join(path, SCHEMA_FILE), "w") as f:
+        json.dump(schema, f, indent=1)
+
+
+def load_timetable(path, columns=None, mmap=True):
+    """Load a stored timetable; columns limits which files are opened"""
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        schema = json.load(f)
+    names = schema["columns"] if columns is None else columns
+    mode = "r" if mmap else None
+    data = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode) for name in names}
+    categories = {k: v for k, v in schema["categories"].items() if k in data}
+    time_columns = [c for c in schema["time_columns"] if c in data]
+    return Timetable(data, categories, time_columns)
+
+
+def save_parquet(path, timetable):
+    """Write the timetable as one Parquet file, category columns as dictionary columns; needs pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+    arrays, names = [], []
+    for name, values in timetable.columns.items():
+        values = np.asarray(values)
+        if name in timetable.categories:
+            arrays.append(pa.DictionaryArray.from_arrays(values, timetable.categories[name]))
+        else:
+            arrays.append(pa.array(values))
+        names.append(name)
+    table = pa.Table.from_arrays(arrays, names=names)
+    metadata = {b"time_columns": json.dumps(timetable.time_columns).encode()}
+    pq.write_table(table.replace_schema_metadata(metadata), path)
+
+
+def load_parquet(path, columns=None):
+    """Read a Parquet timetable through a memory map; needs pyarrow"""
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    data, categories = {}, {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if hasattr(column, "dictionary"):
+            data[name] = column.indices.to_numpy(zero_copy_only=False)
+            categories[name] = column.dictionary.to_pylist()
+        else:
+            data[name] = column.to_numpy(zero_copy_only=False)
+    metadata = table.schema.metadata or {}
+    time_columns = json.loads(metadata.get(b"time_columns", b"[]"))
+    return Timetable(data, categories, [c for c in time_columns if c in data])
+
+
+if __name__ == "__main__":
+    # Convert a generated CSV schedule to the columnar store
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "train_schedule_326_with_return.csv"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + "_columns"
+    from schedule_reader import TIME_COLUMNS
+
+    frame = pd.read_csv(source)
+    time_columns = [c for c in frame.columns if c in TIME_COLUMNS]
+    timetable = from_frame(
+        frame,
+        time_columns=time_columns,
+        category_columns=[c for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])
+                          and c not in time_columns],
+        float_columns=[c for c in frame.columns if pd.api.types.is_float_dtype(frame[c])],
+    )
+    save_timetable(target, timetable)
+    print(f"{len(timetable)} rows -> {target}")
@@ -0,0 +1,123 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from sim_time import MISSING, parse_times
+from timetable_store import SCHEMA_FILE
+
+
+# ----------- Streaming Timetable Sinks -----------
+# Generators yield the timetable in chunks (one train, or one hour of trips) and a sink
+# writes each chunk as soon as it arrives, so memory stays at one chunk however many
+# days or lines are generated.
+
+class CsvSink:
+    """Appends chunks (DataFrames or lists of rows/dicts) to one CSV file."""
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._file = open(path, "w", newline="")
+        self._header = True
+
+    def write(self, chunk):
+        frame = chunk if isinstance(chunk, pd.DataFrame) else pd.DataFrame(chunk, columns=self.columns)
+        frame.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+        self.rows += len(frame)
+        self._file.flush()
+
+    def close(self):
+        if self._header and self.columns is not None:
+            pd.DataFrame(columns=self.columns).to_csv(self._file, index=False)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnarSink:
+    """Appends chunks to the columnar store layout read by timetable_store.load_timetable.
+
+    Each column is appended to a raw file as it arrives; category names are interned
+    across chunks, so codes stay stable. close() turns the raw files into .npy files
+    and writes schema.json.
+    """
+
+    def __init__(self, path, time_columns=(), category_columns=(), float_columns=()):
+        self.path = path
+        self.time_columns = list(time_columns)
+        self.category_columns = list(category_columns)
+        self.float_columns = list(float_columns)
+        self.rows = 0
+        self.dtypes = {}
+        self.categories = {name: {} for name in self.category_columns}
+        self._files = {}
+        os.makedirs(path, exist_ok=True)
+
+    def _encode(self, name, values):
+        if name in self.time_columns:
+            if pd.api.types.is_numeric_dtype(values):
+                return values.fillna(MISSING).to_numpy().astype(np.int32)
+            return parse_times(values)
+        if name in self.categories:
+            table = self.categories[name]
+            codes = [table.setdefault(str(v), len(table)) for v in values]
+            return np.array(codes, dtype=np.int32)
+        if name in self.float_columns:
+            return pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float32)
+        return values.to_numpy()
+
+    def write(self, chunk):
+        frame = chunk if isinstance(chunk, pd.DataFrame) else pd.DataFrame(chunk)
+        for name in frame.columns:
+            values = self._encode(name, frame[name])
+            if values.dtype == object:
+                raise TypeError(f"column {name!r} is not numeric; make it a category column")
+            dtype = self.dtypes.setdefault(name, values.dtype)
+            if name not in self._files:
+                self._files[name] = open(os.path.join(self.path, name + ".raw"), "wb")
+            values.astype(dtype, copy=False).tofile(self._files[name])
+            self._files[name].flush()
+        self.rows += len(frame)
+
+    def close(self):
+        for name, f in self._files.items():
+            f.close()
+            raw = os.path.join(self.path, name + ".raw")
+            source = np.memmap(raw, dtype=self.dtypes[name], mode="r") if self.rows else np.empty(0, self.dtypes[name])
+            target = np.lib.format.open_memmap(os.path.join(self.path, name + ".npy"), mode="w+",
+                                               dtype=self.dtypes[name], shape=(self.rows,))
+            target[:] = source
+            target.flush()
+            del source, target
+            os.remove(raw)
+        schema = {
+            "columns": list(self._files),
+            "categories": {name: list(table) for name, table in self.categories.items()},
+            "time_columns": [c for c in self.time_columns if c in self._files],
+        }
+        with open(os.path.join(self.path, SCHEMA_FILE), "w") as f:
+            json.dump(schema, f, indent=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_stream(chunks, *sinks):
+    """Send every chunk of a generator to each sink; returns the number of chunks"""
+    n = 0
+    for chunk in chunks:
+        for sink in sinks:
+            sink.write(chunk)
+        n += 1
+    return n
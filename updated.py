@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+
+from schedule_reader import read_schedule
+from sim_time import format_times, format_time_axis, to_seconds
+from timetable_stream import CsvSink, write_stream
 
 # Station data: [station, line, type, distance, run_time, dwell_time, civil_speed]
 stations = [
@@ -51,101 +54,72 @@ def calculate_speed(distance, run_time, civil_speed):
     speed = (float(distance) / float(run_time)) * 3.6  # m/s to km/h
     return min(speed, civil_speed)
 
+def leg_frame(train_id, seq, start_time, direction):
+    """One journey over seq from start_time (s) plus the turnaround at its terminal.
+
+    Times are summed as integer seconds and only formatted for the chunk; returns the
+    chunk and the time the train is ready for its next leg.
+    """
+    legs = np.array([s[4] + s[5] for s in seq])
+    departure = start_time + np.cumsum(legs)
+    arrival = departure - legs
+    topspeed = [calculate_speed(s[3], s[4], s[6]) for s in seq]
+    ready = int(departure[-1]) + turnaround_time
+    leg = pd.DataFrame({
+        'train_id': train_id,
+        'arrival_time': format_times(np.append(arrival, departure[-1])),
+        'departure_time': format_times(np.append(departure, ready)),
+        'station': [s[0] for s in seq] + [seq[-1][0]],
+        'direction': [direction] * len(seq) + ['turnaround'],
+        'top_speed': [round(v, 2) if v else None for v in topspeed] + [None],
+    })
+    return leg, ready
+
 def generate_journey(start_station, start_time, direction):
     """Generate timetable for one journey in specified direction"""
-    journey_data = []
     start_idx = next(i for i, s in enumerate(stations) if s[0] == start_station)
     
     if direction == 'forward':
         sequence = stations[start_idx:]
-        train_id = f"T{len(journey_data)//len(stations)+1:02d}F"
+        train_id = "T01F"
     else:
         sequence = list(reversed(stations[:start_idx+1]))
-        train_id = f"T{len(journey_data)//len(stations)+1:02d}R"
+        train_id = "T01R"
     
-    arrival = start_time
-    for s in sequence:
-        departure = arrival + timedelta(seconds=s[4] + s[5])
-        topspeed = calculate_speed(s[3], s[4], s[6])
-        
-        journey_data.append({
-            'train_id': train_id,
-            'arrival_time': arrival.strftime('%H:%M'),
-            'departure_time': departure.strftime('%H:%M'),
-            'station': s[0],
-            'direction': direction,
-            'top_speed': round(topspeed, 2) if topspeed else None
-        })
-        arrival = departure
-    
-    # Add turnaround time at terminal
-    terminal = sequence[-1][0]
-    journey_data.append({
-        'train_id': train_id,
-        'arrival_time': arrival.strftime('%H:%M'),
-        'departure_time': (arrival + timedelta(seconds=turnaround_time)).strftime('%H:%M'),
-        'station': terminal,
-        'direction': 'turnaround',
-        'top_speed': None
-    })
-    
-    return journey_data
+    journey, _ = leg_frame(train_id, sequence, to_seconds(start_time), direction)
+    return journey.to_dict('records')
 
 # Generate timetable
-all_journeys = []
-base_time = datetime.strptime('05:00', '%H:%M')  # Start at 5:00
+base_time = to_seconds('05:00')  # Start at 5:00
+end_time = to_seconds('23:59')
 
-for station in start_stations:
-    start_idx = next(i for i, s in enumerate(stations) if s[0] == station)
-    for n in range(trains_per_station):
-        train_num = f"{station[:3].upper()}{n+1:02d}"
-        # Initial direction and sequence
-        if station in ['GAIMUKH', 'CADBUARY JUNCTION']:
-            forward_seq = list(reversed(stations[:start_idx+1]))
-            terminal = forward_seq[-1][0]
-        else:
-            forward_seq = stations[start_idx:]
-            terminal = forward_seq[-1][0]
-        # Start at 5:00 plus headway for each train
-        current_time = base_time + timedelta(seconds=n * headway)
-        current_station = station
-        direction = 'forward'
-        seq = forward_seq
-        while current_time < datetime.strptime('23:59', '%H:%M'):
-            # Journey in current direction
-            for s in seq:
-                departure = current_time + timedelta(seconds=s[4] + s[5])
-                topspeed = calculate_speed(s[3], s[4], s[6])
-                all_journeys.append({
-                    'train_id': train_num,
-                    'arrival_time': current_time.strftime('%H:%M'),
-                    'departure_time': departure.strftime('%H:%M'),
-                    'station': s[0],
-                    'direction': direction,
-                    'top_speed': round(topspeed, 2) if topspeed else None
-                })
-                current_time = departure
-            # Turnaround at terminal
-            all_journeys.append({
-                'train_id': train_num,
-                'arrival_time': current_time.strftime('%H:%M'),
-                'departure_time': (current_time + timedelta(seconds=turnaround_time)).strftime('%H:%M'),
-                'station': seq[-1][0],
-                'direction': 'turnaround',
-                'top_speed': None
-            })
-            current_time = current_time + timedelta(seconds=turnaround_time)
-            # Reverse direction and sequence for next leg
-            if direction == 'forward':
-                seq = list(reversed(seq))
-                direction = 'return'
+def train_legs():
+    """Yield the stops of one leg (journey + turnaround) at a time, so the day is never held in memory"""
+    for station in start_stations:
+        start_idx = next(i for i, s in enumerate(stations) if s[0] == station)
+        for n in range(trains_per_station):
+            train_num = f"{station[:3].upper()}{n+1:02d}"
+            # Initial direction and sequence
+            if station in ['GAIMUKH', 'CADBUARY JUNCTION']:
+                forward_seq = list(reversed(stations[:start_idx+1]))
             else:
+                forward_seq = stations[start_idx:]
+            # Start at 5:00 plus headway for each train
+            current_time = base_time + n * headway
+            direction = 'forward'
+            seq = forward_seq
+            while current_time < end_time:
+                leg, current_time = leg_frame(train_num, seq, current_time, direction)
+                yield leg
+                # Reverse direction and sequence for next leg
                 seq = list(reversed(seq))
-                direction = 'forward'
+                direction = 'return' if direction == 'forward' else 'forward'
 
-# Create DataFrame
-df = pd.DataFrame(all_journeys)
-df.to_csv('day_2.csv', index=False)
+# Stream each leg to the CSV as it is generated
+with CsvSink('day_2.csv') as sink:
+    write_stream(train_legs(), sink)
+# Times come back as seconds of the service day (trips past midnight keep counting)
+df = read_schedule('day_2.csv')
 
 # Visualization
 plt.figure(figsize=(15, 10))
@@ -168,7 +142,7 @@ markers = {
 
 for train_id in df['train_id'].unique():
     train_data = df[df['train_id'] == train_id]
-    times = [datetime.strptime(t, '%H:%M') for t in train_data['departure_time']]
+    times = train_data['departure_time'].to_numpy()
     stations_visited = train_data['station']
     y_pos = [station_pos[s] for s in stations_visited]
     directions = train_data['direction']
@@ -187,7 +161,7 @@ for train_id in df['train_id'].unique():
                 linewidth=2 if direction != 'turnaround' else 0
             )
             # Add arrival time as label (optional, comment out if too cluttered)
-            for x, y, arr_time, m in zip(times, y_pos, train_data['arrival_time'], mask):
+            for x, y, arr_time, m in zip(times, y_pos, format_times(train_data['arrival_time'], with_seconds=False), mask):
                 if m and direction != 'turnaround':
                     plt.text(x, y, arr_time, fontsize=7, ha='right', va='bottom', color=colors[direction])
 
@@ -197,12 +171,8 @@ plt.ylabel('Station')
 plt.title('Train Schedule\nBlue=Forward, Orange=Return, Green Diamond=Turnaround')
 plt.grid(True, linestyle='--', alpha=0.5)
 plt.legend(loc='upper left', bbox_to_anchor=(1.01, 1), title="Direction")
-plt.xlim(datetime.strptime('00:00', '%H:%M'), datetime.strptime('23:59', '%H:%M'))
-xtick_times = [datetime.strptime(f"{h:02d}:00", "%H:%M") for h in range(24)]
-xtick_labels = [f"{h:02d}:00" for h in range(24)]
-# Add a final tick at 24:00 (which is 23:59 + 1 minute)
-xtick_times.append(datetime.strptime('23:59', '%H:%M') + timedelta(minutes=1))
-xtick_labels.append('24:00')
-plt.xticks(xtick_times, xtick_labels)
+plt.xlim(0, to_seconds('24:00'))
+# Hourly ticks, 00:00 through 24:00
+format_time_axis(plt.gca(), step=3600)
 plt.tight_layout()
 plt.show()
\ No newline at end of file